@@ -0,0 +1,163 @@
+"""
+analytics.py
+
+contains client-side analytics over expense amounts stored as integer cents
+"""
+
+from argparse import Namespace
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from datetime import date
+
+from database import get_connection
+from utilities import build_expense_filters, format_amount
+
+
+def load_amounts(
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    db="expenses.db",
+    chunk_size: int = 50000,
+) -> array:
+    """
+    Loads expense amounts in chronological order into a compact array of 64-bit integer cents.
+
+    The array uses 8 bytes per amount and supports the buffer protocol, so it can be handed
+    to numpy.frombuffer(amounts, dtype="int64") without copying.
+
+    Args:
+        start (date): Only load expenses on or after this day.
+        end (date): Only load expenses on or before this day.
+        category (str): Only load expenses in this category.
+        db (str): The path to the database.
+        chunk_size (int): The number of rows fetched from the database at a time.
+
+    Returns:
+        array: An array('q') of amounts in cents.
+    """
+    where, params = build_expense_filters(start, end, category)
+
+    conn = get_connection(db)
+    cur = conn.execute(
+        f"""
+        SELECT IFNULL(amount, 0)
+        FROM expenses
+        {where}
+        ORDER BY date, id
+        """,
+        params,
+    )
+
+    amounts = array("q")
+    while rows := cur.fetchmany(chunk_size):
+        amounts.extend(row[0] for row in rows)
+
+    return amounts
+
+
+def percentiles(amounts: Sequence[int], points: Sequence[float]) -> list[float]:
+    """
+    Computes percentiles of amounts with linear interpolation between ranks.
+
+    Args:
+        amounts (Sequence[int]): Amounts in cents.
+        points (Sequence[float]): The percentiles to compute, between 0 and 100.
+
+    Returns:
+        list[float]: The amount in cents at each percentile.
+    """
+    ordered = sorted(amounts)
+    if not ordered:
+        return [0.0 for _ in points]
+
+    results = []
+    for point in points:
+        rank = (len(ordered) - 1) * point / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        results.append(ordered[low] + (ordered[high] - ordered[low]) * (rank - low))
+
+    return results
+
+
+def moving_average(amounts: Sequence[int], window: int) -> list[float]:
+    """
+    Computes the moving average of amounts over a fixed window using a running sum.
+
+    Args:
+        amounts (Sequence[int]): Amounts in cents, in chronological order.
+        window (int): The number of amounts in each average.
+
+    Returns:
+        list[float]: One average in cents per full window.
+    """
+    if window < 1 or window > len(amounts):
+        return []
+
+    total = sum(amounts[:window])
+    averages = [total / window]
+    for i in range(window, len(amounts)):
+        total += amounts[i] - amounts[i - window]
+        averages.append(total / window)
+
+    return averages
+
+
+def category_histograms(
+    edges: Sequence[int], db="expenses.db", chunk_size: int = 50000
+) -> dict[str, list[int]]:
+    """
+    Counts expenses per category into amount buckets in a single pass over the table.
+
+    Args:
+        edges (Sequence[int]): Sorted bucket edges in cents. Bucket i holds amounts below edges[i]
+            and at or above edges[i - 1], the last bucket holds everything from edges[-1] up.
+        db (str): The path to the database.
+        chunk_size (int): The number of rows fetched from the database at a time.
+
+    Returns:
+        dict[str, list[int]]: The bucket counts for each category.
+    """
+    conn = get_connection(db)
+    cur = conn.execute("""
+        SELECT IFNULL(category, ''), IFNULL(amount, 0)
+        FROM expenses
+    """)
+
+    histograms = {}
+    while rows := cur.fetchmany(chunk_size):
+        for category, amount in rows:
+            counts = histograms.get(category)
+            if counts is None:
+                counts = histograms[category] = [0] * (len(edges) + 1)
+            counts[bisect_right(edges, amount)] += 1
+
+    return histograms
+
+
+def handle_stats(args: Namespace) -> None:
+    """
+    Handles the CLI arguments for expense statistics.
+
+    Parameters:
+        args (Namespace): Parsed command line fields containing optional date range and category filters.
+
+    Returns:
+        None
+    """
+    amounts = load_amounts(start=args.start, end=args.end, category=args.category)
+
+    if not amounts:
+        print("No expenses match the given filters.")
+
+        return
+
+    p50, p90, p99 = percentiles(amounts, [50, 90, 99])
+    total = sum(amounts)
+
+    print(f"Expenses: {len(amounts)}")
+    print(f"Total: {format_amount(total)}")
+    print(f"Mean: {total / len(amounts) / 100:.2f}")
+    print(f"Median: {p50 / 100:.2f}  p90: {p90 / 100:.2f}  p99: {p99 / 100:.2f}")
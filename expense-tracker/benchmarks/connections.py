@@ -0,0 +1,179 @@
+"""
+connections.py
+
+counts the sqlite connections each CLI command opens, optionally against a git revision
+
+every command runs as its own `python3 main.py ...` process in a scratch directory,
+with sqlite3.connect wrapped to count its calls. --before checks the same directory out
+of a git revision, i.e. the per-call connect pattern that get_connection replaced
+
+usage:
+    python3 benchmarks/connections.py --before 7a88edb~1 --out connections.json
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from argparse import ArgumentParser
+from pathlib import Path
+
+TREE = Path(__file__).resolve().parent.parent
+
+# commands every revision of the CLI accepts, run in order on one database. update is
+# left out: before get_connection its string id matched no case and it did nothing
+COMMANDS = [
+    ["add", "-d", "Coffee", "-a", "3.50", "-c", "food"],
+    ["add", "-d", "Train ticket", "-a", "40", "-c", "travel"],
+    ["view"],
+    ["summary"],
+    ["summary", "-c", "food"],
+    ["summary", "-m", "1"],
+    ["export"],
+    ["remove", "2"],
+]
+
+# runs main.py in this process with sqlite3.connect counted, then writes the count out
+COUNTING_MAIN = """
+import atexit, runpy, sqlite3, sys
+
+tree, count_path = sys.argv[1], sys.argv[2]
+calls = 0
+connect = sqlite3.connect
+
+def counting_connect(*args, **kwargs):
+    global calls
+    calls += 1
+    return connect(*args, **kwargs)
+
+def write_count():
+    with open(count_path, "w") as f:
+        f.write(str(calls))
+
+sqlite3.connect = counting_connect
+atexit.register(write_count)
+sys.path.insert(0, tree)
+sys.argv = [tree + "/main.py", *sys.argv[3:]]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def count_connections(tree: Path, commands: list[list[str]]) -> list[int]:
+    """
+    Runs CLI commands one process at a time against a fresh database.
+
+    Args:
+        tree (Path): The directory holding main.py.
+        commands (list[list[str]]): The arguments of each command, run in order.
+
+    Returns:
+        list[int]: The number of sqlite3.connect calls made by each command.
+
+    Raises:
+        RuntimeError: If a command exits with an error.
+    """
+    counts = []
+
+    with tempfile.TemporaryDirectory() as scratch:
+        count_path = os.path.join(scratch, "connections.count")
+
+        for argv in commands:
+            result = subprocess.run(
+                [sys.executable, "-c", COUNTING_MAIN, str(tree), count_path, *argv],
+                cwd=scratch,
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"{' '.join(argv)} failed: {result.stderr.strip()}")
+
+            with open(count_path) as f:
+                counts.append(int(f.read()))
+
+    return counts
+
+
+def checkout(revision: str, into: str) -> Path:
+    """
+    Extracts the expense-tracker directory of a git revision.
+
+    Args:
+        revision (str): Any git revision, i.e. a commit hash or tag.
+        into (str): The directory to extract into.
+
+    Returns:
+        Path: The extracted directory.
+    """
+    prefix = subprocess.run(
+        ["git", "rev-parse", "--show-prefix"],
+        cwd=TREE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    top = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        cwd=TREE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    # git archive refuses to run from a subdirectory, so the path is given from the top
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", f"{revision}:{prefix}"],
+        cwd=top,
+        capture_output=True,
+        check=True,
+    ).stdout
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(into)
+
+    return Path(into)
+
+
+def run_connection_counts(before: str | None = None) -> dict:
+    """
+    Counts the connections per command for the working tree and, optionally, a revision.
+
+    Args:
+        before (str | None): A git revision to compare against.
+
+    Returns:
+        dict: The revision compared against and one result entry per command.
+    """
+    after = count_connections(TREE, COMMANDS)
+
+    if before:
+        with tempfile.TemporaryDirectory() as tmp:
+            previous = count_connections(checkout(before, tmp), COMMANDS)
+    else:
+        previous = [None] * len(COMMANDS)
+
+    results = {}
+    for argv, before_count, after_count in zip(COMMANDS, previous, after):
+        name = " ".join(argv)
+        results[name] = {"before": before_count, "after": after_count}
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    return {"before": before, "results": results}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-b", "--before", help="a git revision to count the same commands against"
+    )
+    parser.add_argument("-o", "--out", help="write the JSON results to a file")
+    args = parser.parse_args()
+
+    results = run_connection_counts(args.before)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
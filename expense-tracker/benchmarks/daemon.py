@@ -0,0 +1,236 @@
+"""
+daemon.py
+
+compares command throughput through a running `serve` daemon against cold CLI calls
+
+the same mix of commands runs three ways on one database: as cold `python3 main.py ...`
+processes with no daemon, as the same processes forwarding to a daemon, and from a local
+load generator that sends commands straight to the daemon's socket from several clients
+
+usage:
+    python3 benchmarks/daemon.py --calls 200 --clients 4 --out daemon.json
+    python3 benchmarks/daemon.py --ledger ledger-1m.db
+"""
+
+import json
+import os
+import platform
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import SOCKET_PATH, forward  # noqa: E402
+
+MAIN = str(Path(__file__).resolve().parent.parent / "main.py")
+
+# the commands each run cycles through, a write and two reads like a typical cron script
+COMMANDS = [
+    ["add", "-d", "Coffee", "-a", "3.50", "-c", "food"],
+    ["view", "--limit", "10"],
+    ["summary", "-c", "food"],
+]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """
+    Summarizes the latency of a run of commands.
+
+    Args:
+        latencies (list[float]): The seconds each command took.
+        elapsed (float): The wall-clock seconds of the whole run.
+
+    Returns:
+        dict: ops/sec over the wall-clock time and p50/p99 latency in milliseconds.
+    """
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+    }
+
+
+def run_cli(directory: str, calls: int) -> dict:
+    """
+    Runs commands as separate CLI processes, one after another.
+
+    main.py forwards them to a daemon if its socket is in the directory, and otherwise
+    runs them itself.
+
+    Args:
+        directory (str): The directory holding the database, and the socket if any.
+        calls (int): The number of commands to run.
+
+    Returns:
+        dict: The throughput and latency summary.
+
+    Raises:
+        RuntimeError: If a command exits with an error.
+    """
+    latencies = []
+
+    start = time.perf_counter()
+    for i in range(calls):
+        argv = COMMANDS[i % len(COMMANDS)]
+        call_start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, MAIN, *argv], cwd=directory, capture_output=True, text=True
+        )
+        latencies.append(time.perf_counter() - call_start)
+
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed: {result.stderr.strip()}")
+    elapsed = time.perf_counter() - start
+
+    return summarize(latencies, elapsed)
+
+
+def run_socket(socket_path: str, calls: int, clients: int) -> dict:
+    """
+    Sends commands straight to the daemon's socket from several concurrent clients.
+
+    Args:
+        socket_path (str): The path to the daemon's unix domain socket.
+        calls (int): The number of commands to send in total.
+        clients (int): The number of clients sending at once.
+
+    Returns:
+        dict: The throughput and latency summary.
+
+    Raises:
+        RuntimeError: If the daemon can't be reached or a command exits with an error.
+    """
+
+    def send(i: int) -> float:
+        argv = COMMANDS[i % len(COMMANDS)]
+        call_start = time.perf_counter()
+        response = forward(argv, socket_path)
+        latency = time.perf_counter() - call_start
+
+        if response is None or response[1] != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed: {response}")
+
+        return latency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(send, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    return summarize(latencies, elapsed)
+
+
+def start_daemon(directory: str, timeout: float = 10.0) -> subprocess.Popen:
+    """
+    Starts `main.py serve` in a directory and waits until it answers.
+
+    Args:
+        directory (str): The directory holding the database.
+        timeout (float): The seconds to wait for the daemon.
+
+    Returns:
+        subprocess.Popen: The daemon process.
+
+    Raises:
+        RuntimeError: If the daemon doesn't answer in time.
+    """
+    daemon = subprocess.Popen(
+        [sys.executable, MAIN, "serve"],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    socket_path = os.path.join(directory, SOCKET_PATH)
+
+    deadline = time.monotonic() + timeout
+    while forward(["view", "--limit", "0"], socket_path) is None:
+        if daemon.poll() is not None or time.monotonic() > deadline:
+            daemon.kill()
+            raise RuntimeError("the daemon didn't start.")
+        time.sleep(0.05)
+
+    return daemon
+
+
+def run_daemon_benchmarks(
+    calls: int = 200, clients: int = 4, ledger: str | None = None
+) -> dict:
+    """
+    Times the same commands cold, forwarded by the CLI, and sent straight to the daemon.
+
+    Args:
+        calls (int): The number of commands per run.
+        clients (int): The number of concurrent clients sending straight to the socket.
+        ledger (str | None): A ledger made by generate.py to run against. It is copied,
+            so the added expenses don't change it. A new database is used by default.
+
+    Returns:
+        dict: The environment and one result entry per way of running the commands.
+    """
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        if ledger:
+            shutil.copyfile(ledger, os.path.join(directory, "expenses.db"))
+
+        results["cold_cli"] = run_cli(directory, calls)
+        print(f"cold_cli: {results['cold_cli']}", file=sys.stderr)
+
+        daemon = start_daemon(directory)
+        try:
+            results["forwarded_cli"] = run_cli(directory, calls)
+            print(f"forwarded_cli: {results['forwarded_cli']}", file=sys.stderr)
+
+            socket_path = os.path.join(directory, SOCKET_PATH)
+            results["socket"] = run_socket(socket_path, calls, clients)
+            print(f"socket: {results['socket']}", file=sys.stderr)
+        finally:
+            # SIGTERM lets the daemon remove its socket file on the way out
+            daemon.send_signal(signal.SIGTERM)
+            daemon.wait()
+
+    cold = results["cold_cli"]["ops_per_sec"]
+    for result in results.values():
+        result["speedup"] = round(result["ops_per_sec"] / cold, 2)
+
+    return {
+        "ledger": os.path.abspath(ledger) if ledger else None,
+        "clients": clients,
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-n", "--calls", type=int, default=200, help="commands per run")
+    parser.add_argument(
+        "-c",
+        "--clients",
+        type=int,
+        default=4,
+        help="concurrent clients sending straight to the socket",
+    )
+    parser.add_argument("-l", "--ledger", help="a ledger made by generate.py to copy")
+    parser.add_argument("-o", "--out", help="write the JSON results to a file")
+    args = parser.parse_args()
+
+    results = run_daemon_benchmarks(args.calls, args.clients, args.ledger)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,141 @@
+"""
+generate.py
+
+generates deterministic synthetic expense ledgers for benchmarking
+
+usage:
+    python3 benchmarks/generate.py --size 1m --out ledger-1m.db
+"""
+
+import math
+import random
+import sys
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import transaction  # noqa: E402
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# category: (relative frequency, median amount in dollars, descriptions)
+CATEGORIES = {
+    "groceries": (30, 45, ["supermarket", "farmers market", "corner store"]),
+    "dining": (18, 25, ["lunch", "dinner out", "coffee", "takeout"]),
+    "transport": (14, 15, ["fuel", "bus pass", "taxi", "parking"]),
+    "shopping": (11, 60, ["clothes", "electronics", "books", "home goods"]),
+    "entertainment": (9, 30, ["movies", "concert", "streaming", "games"]),
+    "utilities": (6, 90, ["electricity", "water", "internet", "phone"]),
+    "health": (5, 70, ["pharmacy", "dentist", "gym"]),
+    "travel": (4, 350, ["flight", "hotel", "rental car"]),
+    "rent": (3, 1500, ["rent"]),
+}
+
+LEDGER_END = date(2025, 12, 31)
+
+
+def generate_rows(rows: int, seed: int = 42, years: int = 5) -> Iterator[tuple]:
+    """
+    Lazily generates realistic (date, description, amount in cents, category) rows.
+
+    Amounts are log-normally distributed around a per-category median and dates are spread
+    over the given number of years ending on LEDGER_END, with more spending on weekends
+    and in December. The same seed always produces the same rows.
+
+    Args:
+        rows (int): The number of rows to generate.
+        seed (int): The random seed.
+        years (int): The number of years the ledger spans.
+
+    Returns:
+        Iterator[tuple]: The generated rows, in roughly chronological order.
+    """
+    rng = random.Random(seed)
+    names = list(CATEGORIES)
+    weights = [CATEGORIES[name][0] for name in names]
+    start = datetime.combine(
+        LEDGER_END - timedelta(days=365 * years), datetime.min.time()
+    )
+    span = (LEDGER_END - start.date()).days * 86400
+
+    for i in range(rows):
+        moment = start + timedelta(seconds=span * i // rows + rng.randrange(60))
+
+        # push some weekday spending onto weekends and some spending into december
+        if moment.weekday() < 5 and rng.random() < 0.15:
+            moment += timedelta(days=5 - moment.weekday())
+        if moment.date() > LEDGER_END:
+            moment = datetime.combine(LEDGER_END, moment.time())
+
+        category = rng.choices(names, weights)[0]
+        _, median, descriptions = CATEGORIES[category]
+        boost = 1.3 if moment.month == 12 else 1.0
+        amount = median * boost * math.exp(rng.gauss(0, 0.6))
+
+        yield (
+            moment.isoformat(),
+            rng.choice(descriptions),
+            max(1, round(amount * 100)),
+            category,
+        )
+
+
+def generate_ledger(
+    db: str, rows: int, seed: int = 42, years: int = 5, batch_size: int = 50_000
+) -> None:
+    """
+    Creates a sqlite ledger filled with generated expenses.
+
+    Args:
+        db (str): The path to the new database. Must not exist yet.
+        rows (int): The number of expenses to generate.
+        seed (int): The random seed.
+        years (int): The number of years the ledger spans.
+        batch_size (int): The number of rows written per transaction.
+
+    Returns:
+        None
+    """
+    if Path(db).exists():
+        raise FileExistsError(f"{db} already exists, pick a new path for the ledger")
+
+    batch = []
+    for row in generate_rows(rows, seed, years):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            with transaction(db) as conn:
+                conn.executemany(
+                    "INSERT INTO expenses (date,description,amount,category) VALUES (?,?,?,?)",
+                    batch,
+                )
+            batch.clear()
+
+    if batch:
+        with transaction(db) as conn:
+            conn.executemany(
+                "INSERT INTO expenses (date,description,amount,category) VALUES (?,?,?,?)",
+                batch,
+            )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-s", "--size", choices=SIZES, default="10k", help="preset ledger size"
+    )
+    parser.add_argument(
+        "-r", "--rows", type=int, help="exact row count (overrides --size)"
+    )
+    parser.add_argument("-o", "--out", help="path to the new ledger database")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--years", type=int, default=5, help="years the ledger spans")
+    args = parser.parse_args()
+
+    rows = args.rows or SIZES[args.size]
+    out = args.out or f"ledger-{args.size if not args.rows else rows}.db"
+
+    generate_ledger(out, rows, seed=args.seed, years=args.years)
+    print(f"Generated {rows} expenses in {out}")
@@ -0,0 +1,199 @@
+"""
+money.py
+
+compares integer-cent amounts against the REAL-dollar float path they replaced, on a generated ledger
+
+the ledger is copied into a temporary table with amounts in REAL dollars, the schema
+before amounts moved to cents, and the same aggregations are timed against both
+
+usage:
+    python3 benchmarks/money.py ledger-10m.db --out money.json
+"""
+
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Callable
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics import moving_average, percentiles  # noqa: E402
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> tuple[float, object]:
+    """
+    Calls a function repeatedly and keeps the fastest time.
+
+    Args:
+        fn (Callable[[], object]): The function to time.
+        repeat (int): The number of calls.
+
+    Returns:
+        tuple[float, object]: The fastest time in seconds and the result of the last call.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def load_floats(conn: sqlite3.Connection, chunk_size: int = 50000) -> list[float]:
+    """
+    Loads REAL dollar amounts into a list, as the float path did.
+
+    Args:
+        conn (sqlite3.Connection): A connection with the legacy table attached.
+        chunk_size (int): The number of rows fetched at a time.
+
+    Returns:
+        list[float]: The amounts in dollars.
+    """
+    cur = conn.execute("SELECT IFNULL(amount, 0) FROM legacy.expenses ORDER BY id")
+    amounts = []
+    while rows := cur.fetchmany(chunk_size):
+        amounts.extend(row[0] for row in rows)
+
+    return amounts
+
+
+def load_cents(conn: sqlite3.Connection, chunk_size: int = 50000) -> array:
+    """
+    Loads integer cents into an array('q'), as analytics.load_amounts does.
+
+    Args:
+        conn (sqlite3.Connection): A connection to the ledger.
+        chunk_size (int): The number of rows fetched at a time.
+
+    Returns:
+        array: The amounts in cents.
+    """
+    cur = conn.execute("SELECT IFNULL(amount, 0) FROM main.expenses ORDER BY id")
+    amounts = array("q")
+    while rows := cur.fetchmany(chunk_size):
+        amounts.extend(row[0] for row in rows)
+
+    return amounts
+
+
+def run_money_benchmarks(ledger: str, repeat: int = 3) -> dict:
+    """
+    Times sums, loads and client-side analytics over float dollars and integer cents.
+
+    Args:
+        ledger (str): The path to a ledger made by generate.py. It is opened read-only.
+        repeat (int): The number of runs per benchmark, the fastest is kept.
+
+    Returns:
+        dict: The environment, the float error of the total and one result entry per benchmark.
+    """
+    results = {}
+
+    def record(name: str, float_fn: Callable, cents_fn: Callable) -> tuple:
+        float_s, float_result = best_of(float_fn, repeat)
+        cents_s, cents_result = best_of(cents_fn, repeat)
+        results[name] = {
+            "float_s": round(float_s, 4),
+            "cents_s": round(cents_s, 4),
+            "speedup": round(float_s / cents_s, 2) if cents_s else None,
+        }
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+        return float_result, cents_result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(f"file:{os.path.abspath(ledger)}?mode=ro", uri=True)
+        conn.execute("ATTACH DATABASE ? AS legacy", (os.path.join(tmp, "legacy.db"),))
+        # the same rows and columns as the ledger, so both scans read as many pages
+        conn.execute(
+            """
+            CREATE TABLE legacy.expenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                description TEXT,
+                amount REAL,
+                category TEXT
+            )
+            """
+        )
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO legacy.expenses (id, date, description, amount, category)
+                SELECT id, date, description, amount / 100.0, category
+                FROM main.expenses
+                ORDER BY id
+                """
+            )
+        rows = conn.execute("SELECT COUNT(*) FROM main.expenses").fetchone()[0]
+
+        float_total, cents_total = record(
+            "sum",
+            lambda: conn.execute("SELECT SUM(amount) FROM legacy.expenses").fetchone()[0],
+            lambda: conn.execute("SELECT SUM(amount) FROM main.expenses").fetchone()[0],
+        )
+        record(
+            "sum_by_category",
+            lambda: conn.execute(
+                "SELECT category, SUM(amount) FROM legacy.expenses GROUP BY category"
+            ).fetchall(),
+            lambda: conn.execute(
+                "SELECT category, SUM(amount) FROM main.expenses GROUP BY category"
+            ).fetchall(),
+        )
+        floats, cents = record("load", lambda: load_floats(conn), lambda: load_cents(conn))
+        record(
+            "percentiles",
+            lambda: percentiles(floats, [50, 90, 99]),
+            lambda: percentiles(cents, [50, 90, 99]),
+        )
+        record(
+            "moving_average",
+            lambda: moving_average(floats, 30),
+            lambda: moving_average(cents, 30),
+        )
+
+        conn.close()
+
+    return {
+        "ledger": os.path.abspath(ledger),
+        "rows": rows,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "float_total": repr(float_total),
+        "exact_total": str(Decimal(cents_total) / 100),
+        # the difference between the float total as printed and the exact total, in dollars
+        "float_error": str(Decimal(repr(float_total)) - Decimal(cents_total) / 100),
+        # a python float costs a 24 byte object plus an 8 byte list slot, a cent 8 bytes
+        "float_load_bytes": sys.getsizeof(floats) + 24 * len(floats),
+        "cents_load_bytes": cents.buffer_info()[1] * cents.itemsize,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("ledger", help="path to a ledger made by generate.py")
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=3, help="runs per benchmark, the fastest is kept"
+    )
+    parser.add_argument("-o", "--out", help="write the JSON results to a file")
+    args = parser.parse_args()
+
+    results = run_money_benchmarks(args.ledger, args.repeat)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,220 @@
+"""
+run.py
+
+times the public functions of utilities.py against a generated ledger and reports the results as JSON
+
+usage:
+    python3 benchmarks/run.py ledger-1m.db --out results.json
+    python3 benchmarks/run.py ledger-1m.db --compare results.json
+"""
+
+import json
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utilities  # noqa: E402
+from database import get_connection  # noqa: E402
+
+
+def peak_rss_kb() -> int:
+    """
+    Returns the peak resident set size of this process so far.
+
+    Returns:
+        int: The peak RSS in kilobytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports bytes, linux reports kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def bench(fn: Callable[[int], object], iterations: int) -> dict:
+    """
+    Calls a function repeatedly and summarizes its latency.
+
+    Args:
+        fn (Callable[[int], object]): The function to time. It receives the iteration number.
+        iterations (int): The number of calls.
+
+    Returns:
+        dict: ops/sec, p50/p99 latency in milliseconds and the peak RSS after the calls.
+    """
+    latencies = []
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for i in range(iterations):
+            start = time.perf_counter()
+            fn(i)
+            latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / sum(latencies), 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def run_benchmarks(db: str, repeat: int = 200, scan_repeat: int = 3) -> dict:
+    """
+    Benchmarks every public utilities function against a ledger.
+
+    The ledger ends up with the same rows it started with: the expenses that are added
+    are the ones later updated and removed.
+
+    Args:
+        db (str): The path to the ledger database.
+        repeat (int): Iterations for point operations (add, update, remove, summaries, paged view).
+        scan_repeat (int): Iterations for operations that read the whole table (full view, export).
+
+    Returns:
+        dict: The environment and one result entry per benchmark.
+    """
+    conn = get_connection(db)
+    rows = conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+    category = conn.execute(
+        "SELECT category FROM expense_rollups ORDER BY total DESC LIMIT 1"
+    ).fetchone()[0]
+    year, month = conn.execute(
+        "SELECT year, month FROM expense_rollups ORDER BY year DESC, month DESC LIMIT 1"
+    ).fetchone()
+
+    added = []
+
+    def add(i):
+        utilities.add_expense(f"benchmark {i}", 12.34, "benchmark", db=db)
+        added.append(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+
+    def update(i):
+        utilities.update_expense(added[i], db=db, amount=43.21, description="updated")
+
+    def remove(i):
+        utilities.remove_expense(added[i], db=db)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export_path = os.path.join(tmp, "export.csv")
+
+        benchmarks = {
+            "add_expense": (add, repeat),
+            "view_total_expenses_page": (
+                lambda i: list(utilities.view_total_expenses(limit=50, db=db)),
+                repeat,
+            ),
+            "view_total_expenses_full": (
+                lambda i: sum(1 for _ in utilities.view_total_expenses(db=db)),
+                scan_repeat,
+            ),
+            "summarize_all_expenses": (
+                lambda i: utilities.summarize_all_expenses(db=db),
+                repeat,
+            ),
+            "summarize_category_expenses": (
+                lambda i: utilities.summarize_category_expenses(category, db=db),
+                repeat,
+            ),
+            "summarize_monthly_expenses": (
+                lambda i: utilities.summarize_monthly_expenses(month, year, db=db),
+                repeat,
+            ),
+            "summarize_category_monthly_expenses": (
+                lambda i: utilities.summarize_category_monthly_expenses(
+                    category, month, year, db=db
+                ),
+                repeat,
+            ),
+            "update_expense": (update, repeat),
+            "remove_expense": (remove, repeat),
+            "export_to_csv": (
+                lambda i: utilities.export_to_csv(db=db, csv_path=export_path),
+                scan_repeat,
+            ),
+        }
+
+        results = {}
+        for name, (fn, iterations) in benchmarks.items():
+            results[name] = bench(fn, iterations)
+            print(f"{name}: {results[name]}", file=sys.stderr)
+
+    return {
+        "ledger": os.path.abspath(db),
+        "rows": rows,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """
+    Formats a side-by-side comparison of two benchmark runs.
+
+    Args:
+        current (dict): The results of this run.
+        baseline (dict): The results of an earlier run.
+
+    Returns:
+        str: One line per benchmark with both p50 latencies and the speedup.
+    """
+    lines = [
+        f"{'benchmark':<38} {'baseline p50':>13} {'current p50':>12} {'speedup':>8}"
+    ]
+
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            lines.append(f"{name:<38} {'-':>13} {result['p50_ms']:>10.3f}ms {'-':>8}")
+            continue
+
+        speedup = before["p50_ms"] / result["p50_ms"] if result["p50_ms"] else 0
+        lines.append(
+            f"{name:<38} {before['p50_ms']:>11.3f}ms"
+            f" {result['p50_ms']:>10.3f}ms {speedup:>7.2f}x"
+        )
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("ledger", help="path to a ledger made by generate.py")
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=200, help="iterations for point operations"
+    )
+    parser.add_argument(
+        "--scan-repeat",
+        type=int,
+        default=3,
+        help="iterations for full-table operations",
+    )
+    parser.add_argument("-o", "--out", help="write the JSON results to a file")
+    parser.add_argument("-c", "--compare", help="JSON results of a baseline run")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.ledger, args.repeat, args.scan_repeat)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(results, json.load(f)))
@@ -0,0 +1,97 @@
+"""
+stress.py
+
+measures sustained insert throughput with several concurrent writer processes
+and checks that no rows are lost or duplicated
+
+usage:
+    python3 benchmarks/stress.py --writers 8 --rows 2000
+"""
+
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from multiprocessing import Process
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def write_expenses(db: str, writer: int, rows: int) -> None:
+    """
+    Adds expenses from one writer process, each with a unique description.
+
+    Args:
+        db (str): The path to the database.
+        writer (int): The number of this writer.
+        rows (int): The number of expenses to add.
+
+    Returns:
+        None
+    """
+    import utilities
+
+    with redirect_stdout(io.StringIO()):
+        for i in range(rows):
+            utilities.add_expense(
+                f"writer {writer} row {i}", 1.0, f"writer {writer}", db
+            )
+
+
+def stress(db: str, writers: int = 8, rows: int = 2000) -> dict:
+    """
+    Runs concurrent writers against a database and verifies the result.
+
+    Args:
+        db (str): The path to the database.
+        writers (int): The number of writer processes.
+        rows (int): The number of expenses each writer adds.
+
+    Returns:
+        dict: Throughput, failed writers and the lost and duplicated row counts.
+    """
+    processes = [
+        Process(target=write_expenses, args=(db, writer, rows))
+        for writer in range(writers)
+    ]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    conn = sqlite3.connect(db)
+    total, distinct = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT description) FROM expenses"
+    ).fetchone()
+    conn.close()
+
+    return {
+        "writers": writers,
+        "rows_per_writer": rows,
+        "inserts_per_sec": round(total / elapsed, 2),
+        "failed_writers": sum(process.exitcode != 0 for process in processes),
+        "lost_rows": writers * rows - distinct,
+        "duplicated_rows": total - distinct,
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-w", "--writers", type=int, default=8)
+    parser.add_argument("-r", "--rows", type=int, default=2000, help="rows per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = stress(os.path.join(tmp, "stress.db"), args.writers, args.rows)
+
+    print(result)
+    if result["failed_writers"] or result["lost_rows"] or result["duplicated_rows"]:
+        sys.exit(1)
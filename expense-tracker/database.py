@@ -0,0 +1,480 @@
+"""
+database.py
+
+manages the sqlite connection and schema for the CLI
+"""
+
+import atexit
+import random
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from decimal import ROUND_HALF_UP, Decimal, Overflow
+
+import profiling
+
+# the range of a sqlite INTEGER column, which amounts are stored in as cents
+MIN_CENTS = -(2**63)
+MAX_CENTS = 2**63 - 1
+
+
+def to_cents(amount: float | str) -> int:
+    """
+    Converts an amount of money to integer cents, rounding half cents up.
+
+    Args:
+        amount (float | str): The amount in dollars.
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        InvalidOperation, ValueError: If the amount isn't a number.
+        OverflowError: If the amount in cents doesn't fit in a sqlite INTEGER.
+    """
+    try:
+        scaled = Decimal(str(amount)) * 100
+    except Overflow as e:
+        raise OverflowError(f"Amount {amount} is out of range.") from e
+
+    # checked before rounding too, since quantize fails on more digits than the context holds
+    if scaled.is_finite() and not MIN_CENTS - 1 <= scaled <= MAX_CENTS + 1:
+        raise OverflowError(f"Amount {amount} is out of range.")
+
+    cents = int(scaled.quantize(Decimal(1), ROUND_HALF_UP))
+    if not MIN_CENTS <= cents <= MAX_CENTS:
+        raise OverflowError(f"Amount {amount} is out of range.")
+
+    return cents
+
+
+def migrated_cents(amount: float | None) -> int | None:
+    """
+    Converts a stored REAL amount to cents while migrating, rounding like new writes do.
+
+    Registered as the to_cents SQL function for the migration to INTEGER cents, so
+    migrated rows go through the same Decimal half-up rounding as to_cents, i.e. a stored
+    1.005 becomes 101 cents rather than float ROUND's 100. Amounts that don't fit in an
+    INTEGER, including infinities, are clamped as CAST would, so one bad row can't block
+    the migration.
+
+    Args:
+        amount (float | None): The stored amount in dollars.
+
+    Returns:
+        int | None: The amount in cents, or None if there was no amount.
+    """
+    if amount is None:
+        return None
+
+    try:
+        return to_cents(amount)
+    except ArithmeticError:
+        return MAX_CENTS if amount > 0 else MIN_CENTS
+
+
+# keeps expense_rollups in sync with every write to expenses, in the same transaction.
+# the insert trigger is kept apart since bulk_insert swaps it for one upsert per batch
+ROLLUP_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS expenses_rollup_insert AFTER INSERT ON expenses
+    BEGIN
+        INSERT INTO expense_rollups (year, month, category, total, count)
+        VALUES (
+            CAST(substr(NEW.date, 1, 4) AS INTEGER),
+            CAST(substr(NEW.date, 6, 2) AS INTEGER),
+            IFNULL(NEW.category, ''),
+            IFNULL(NEW.amount, 0),
+            1
+        )
+        ON CONFLICT (year, month, category) DO UPDATE
+        SET total = total + excluded.total, count = count + 1;
+    END;
+"""
+
+ROLLUP_TRIGGERS = f"""
+    {ROLLUP_INSERT_TRIGGER}
+
+    CREATE TRIGGER IF NOT EXISTS expenses_rollup_delete AFTER DELETE ON expenses
+    BEGIN
+        UPDATE expense_rollups
+        SET total = total - IFNULL(OLD.amount, 0), count = count - 1
+        WHERE year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+        AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+        AND category = IFNULL(OLD.category, '');
+
+        DELETE FROM expense_rollups WHERE count <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS expenses_rollup_update
+    AFTER UPDATE OF date, amount, category ON expenses
+    BEGIN
+        UPDATE expense_rollups
+        SET total = total - IFNULL(OLD.amount, 0), count = count - 1
+        WHERE year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+        AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+        AND category = IFNULL(OLD.category, '');
+
+        DELETE FROM expense_rollups WHERE count <= 0;
+
+        INSERT INTO expense_rollups (year, month, category, total, count)
+        VALUES (
+            CAST(substr(NEW.date, 1, 4) AS INTEGER),
+            CAST(substr(NEW.date, 6, 2) AS INTEGER),
+            IFNULL(NEW.category, ''),
+            IFNULL(NEW.amount, 0),
+            1
+        )
+        ON CONFLICT (year, month, category) DO UPDATE
+        SET total = total + excluded.total, count = count + 1;
+    END;
+"""
+
+ROLLUP_QUERY = """
+    SELECT
+    CAST(substr(date, 1, 4) AS INTEGER),
+    CAST(substr(date, 6, 2) AS INTEGER),
+    IFNULL(category, ''),
+    SUM(IFNULL(amount, 0)),
+    COUNT(*)
+    FROM expenses
+    GROUP BY 1, 2, 3
+"""
+
+# keeps the full-text index in sync with inserted expenses, swapped out by bulk_insert too
+FTS_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_insert AFTER INSERT ON expenses
+    BEGIN
+        INSERT INTO expenses_fts (rowid, description) VALUES (NEW.id, NEW.description);
+    END;
+"""
+
+# indexes the descriptions of every expense inserted after the given id in one statement
+FTS_BATCH_INSERT = """
+    INSERT INTO expenses_fts (rowid, description)
+    SELECT id, description FROM expenses WHERE id > ?
+"""
+
+# applies the rollup changes of every expense inserted after the given id in one statement,
+# for bulk inserts that drop the per-row triggers (see bulk_insert)
+ROLLUP_BATCH_UPSERT = """
+    INSERT INTO expense_rollups (year, month, category, total, count)
+    SELECT
+    CAST(substr(date, 1, 4) AS INTEGER),
+    CAST(substr(date, 6, 2) AS INTEGER),
+    IFNULL(category, ''),
+    SUM(IFNULL(amount, 0)),
+    COUNT(*)
+    FROM expenses
+    WHERE id > ?
+    GROUP BY 1, 2, 3
+    ON CONFLICT (year, month, category) DO UPDATE
+    SET total = total + excluded.total, count = count + excluded.count
+"""
+
+# each entry upgrades the schema by one version. the index of a script + 1 is the
+# version it produces, which is tracked with sqlite's `user_version` pragma.
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        description TEXT,
+        amount REAL,
+        category TEXT
+    );
+    """,
+    # dates are stored as ISO 8601 text, which sorts chronologically, so date range
+    # filters can use these indexes directly instead of evaluating strftime per row
+    """
+    CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date);
+    CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses (category, date);
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS expense_rollups (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        total REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (year, month, category)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_expense_rollups_category ON expense_rollups (category);
+    INSERT INTO expense_rollups (year, month, category, total, count) {ROLLUP_QUERY};
+    {ROLLUP_TRIGGERS}
+    """,
+    # amounts move from REAL dollars to INTEGER cents, converted by migrated_cents. sqlite
+    # can't change a column's type, so the table is rebuilt, which also drops its indexes
+    # and triggers
+    f"""
+    CREATE TABLE expenses_cents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        description TEXT,
+        amount INTEGER,
+        category TEXT
+    );
+    INSERT INTO expenses_cents (id, date, description, amount, category)
+    SELECT id, date, description, to_cents(amount), category
+    FROM expenses;
+    DROP TABLE expenses;
+    ALTER TABLE expenses_cents RENAME TO expenses;
+
+    CREATE INDEX idx_expenses_date ON expenses (date);
+    CREATE INDEX idx_expenses_category_date ON expenses (category, date);
+
+    DROP TABLE expense_rollups;
+    CREATE TABLE expense_rollups (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (year, month, category)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_expense_rollups_category ON expense_rollups (category);
+    INSERT INTO expense_rollups (year, month, category, total, count) {ROLLUP_QUERY};
+    {ROLLUP_TRIGGERS}
+    """,
+    # full-text index over descriptions, kept in sync with the expenses table by triggers
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5 (
+        description,
+        content = 'expenses',
+        content_rowid = 'id',
+        prefix = '2 3'
+    );
+    INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild');
+
+    {FTS_INSERT_TRIGGER}
+
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_delete AFTER DELETE ON expenses
+    BEGIN
+        INSERT INTO expenses_fts (expenses_fts, rowid, description)
+        VALUES ('delete', OLD.id, OLD.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_update AFTER UPDATE OF description ON expenses
+    BEGIN
+        INSERT INTO expenses_fts (expenses_fts, rowid, description)
+        VALUES ('delete', OLD.id, OLD.description);
+        INSERT INTO expenses_fts (rowid, description) VALUES (NEW.id, NEW.description);
+    END;
+    """,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+PRAGMAS = {
+    # wait up to 5s for other writers before a statement fails with "database is locked"
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,
+}
+
+# how often, and starting from how long a delay, a locked BEGIN IMMEDIATE is retried
+LOCK_RETRIES = 8
+LOCK_BACKOFF = 0.05
+
+_connections: dict[str, sqlite3.Connection] = {}
+
+
+def get_connection(db: str = "expenses.db") -> sqlite3.Connection:
+    """
+    Returns the open connection for a database, opening it on first use.
+
+    The first call per process applies the connection pragmas and migrates the schema
+    to the latest version. Every later call reuses the same connection.
+
+    Args:
+        db (str): The path to the database.
+
+    Returns:
+        sqlite3.Connection: The shared connection for the database.
+    """
+    conn = _connections.get(db)
+
+    if conn is None:
+        with profiling.phase("connect"):
+            conn = sqlite3.connect(db)
+            profiling.instrument(conn)
+
+            for pragma, value in PRAGMAS.items():
+                conn.execute(f"PRAGMA {pragma} = {value}")
+
+            migrate(conn)
+            _connections[db] = conn
+
+    return conn
+
+
+def open_connections() -> list[sqlite3.Connection]:
+    """
+    Returns every connection opened by get_connection.
+
+    Returns:
+        list[sqlite3.Connection]: The open connections.
+    """
+    return list(_connections.values())
+
+
+def begin_immediate(conn: sqlite3.Connection) -> None:
+    """
+    Starts a write transaction, retrying with jittered exponential backoff while the database is locked.
+
+    BEGIN IMMEDIATE takes the write lock up front, so the reads and writes inside the
+    transaction can't interleave with another writer's.
+
+    Args:
+        conn (sqlite3.Connection): An open database connection.
+
+    Returns:
+        None
+
+    Raises:
+        sqlite3.OperationalError: If the database is still locked after LOCK_RETRIES attempts.
+    """
+    delay = LOCK_BACKOFF
+
+    for attempt in range(LOCK_RETRIES + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or attempt == LOCK_RETRIES:
+                raise
+            time.sleep(delay + random.uniform(0, delay))
+            delay *= 2
+
+
+@contextmanager
+def transaction(db: str = "expenses.db") -> Iterator[sqlite3.Connection]:
+    """
+    Runs the enclosed statements in a single write transaction on the shared connection.
+
+    Commits when the block exits normally, rolls back if it raises.
+
+    Args:
+        db (str): The path to the database.
+
+    Returns:
+        Iterator[sqlite3.Connection]: The shared connection, inside the transaction.
+    """
+    conn = get_connection(db)
+
+    with profiling.phase("transaction"):
+        begin_immediate(conn)
+
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+
+@contextmanager
+def bulk_insert(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Drops the per-row rollup and full-text triggers for the expenses inserted in the
+    enclosed block, then applies their rollups with one grouped upsert, indexes their
+    descriptions with one insert and restores the triggers.
+
+    A trigger costs a few microseconds per row even when a WHEN clause skips it, so they
+    are dropped rather than disabled, and fts5 indexes a batch far faster than row by row.
+    Must be used inside a transaction: sqlite's DDL is transactional, so no other
+    connection sees the triggers missing and a failed block rolls back with them. Updates
+    and deletes in the block still go through their triggers.
+
+    Args:
+        conn (sqlite3.Connection): A connection inside a write transaction.
+
+    Returns:
+        Iterator[None]
+    """
+    # ids only grow with AUTOINCREMENT, so the block's rows are the ones above this
+    (last_id,) = conn.execute("SELECT IFNULL(MAX(id), 0) FROM expenses").fetchone()
+
+    conn.execute("DROP TRIGGER IF EXISTS expenses_rollup_insert")
+    conn.execute("DROP TRIGGER IF EXISTS expenses_fts_insert")
+    yield
+    conn.execute(ROLLUP_INSERT_TRIGGER)
+    conn.execute(FTS_INSERT_TRIGGER)
+
+    conn.execute(ROLLUP_BATCH_UPSERT, (last_id,))
+    conn.execute(FTS_BATCH_INSERT, (last_id,))
+
+
+def split_statements(script: str) -> Iterator[str]:
+    """
+    Splits a SQL script into individual statements, keeping trigger bodies intact.
+
+    Args:
+        script (str): The SQL script.
+
+    Returns:
+        Iterator[str]: Each complete statement in the script.
+    """
+    statement = ""
+
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                yield statement
+            statement = ""
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Runs any migrations the database hasn't seen yet.
+
+    All pending migrations run in one write transaction and the schema version is read
+    inside it, so concurrent processes can't apply the same migration twice.
+
+    Args:
+        conn (sqlite3.Connection): An open database connection.
+
+    Returns:
+        int: The schema version of the database after migrating.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    conn.create_function("to_cents", 1, migrated_cents, deterministic=True)
+    begin_immediate(conn)
+
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for script in MIGRATIONS[version:]:
+            for statement in split_statements(script):
+                conn.execute(statement)
+
+        conn.execute(f"PRAGMA user_version = {max(version, SCHEMA_VERSION)}")
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+    return max(version, SCHEMA_VERSION)
+
+
+def close_connections() -> None:
+    """
+    Closes every connection opened by get_connection.
+
+    Returns:
+        None
+    """
+    while _connections:
+        _, conn = _connections.popitem()
+        conn.close()
+
+
+atexit.register(close_connections)
@@ -1,10 +1,37 @@
-from parsers import args, parser
-from variables import COMMANDS
+import os
+import sys
+
+import profiling
+import server
+from parsers import parser
 
 if __name__ == "__main__":
+    args = parser.parse_args()
+    profiled = args.profile or os.environ.get(profiling.PROFILE_ENV)
+
+    # hand the command to a running daemon if there is one, skipping the local db setup.
+    # profiled commands always run here, since the trace measures this process
+    if (
+        args.command != "serve"
+        and not profiled
+        and os.path.exists(server.SOCKET_PATH)
+    ):
+        response = server.forward(sys.argv[1:])
+
+        if response is not None:
+            output, status = response
+            sys.stdout.write(output)
+            sys.exit(status)
+
+    from variables import COMMANDS
+
     handler = COMMANDS.get(args.command)
 
-    if handler:
+    if handler and profiled:
+        profiling.run_profiled(
+            handler, args, trace_path=args.profile_out, pstats_path=args.pstats_out
+        )
+    elif handler:
         handler(args)
     else:
         parser.print_help()
@@ -5,8 +5,20 @@ contains all the argument parsing for the CLI
 """
 
 from argparse import ArgumentParser
+from datetime import date
+
+from server import SOCKET_PATH
 
 parser = ArgumentParser()
+parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="print per-phase timings and counters of the command as JSON to stderr (or set EXPENSES_PROFILE=1)",
+)
+parser.add_argument(
+    "--profile-out", help="append the JSON timing trace to a file instead of stderr"
+)
+parser.add_argument("--pstats-out", help="write cProfile stats of the command to a file")
 subparsers = parser.add_subparsers(dest="command", required=True)
 
 # require certain args only for add cmd
@@ -22,27 +34,158 @@ add_parser.add_argument(
 )
 
 view_parser = subparsers.add_parser(name="view")
+view_parser.add_argument(
+    "-l", "--limit", type=int, help="the maximum number of expenses to list"
+)
+view_parser.add_argument(
+    "-o", "--offset", type=int, default=0, help="the number of expenses to skip"
+)
+view_parser.add_argument(
+    "--after-id",
+    type=int,
+    help="only list expenses with an ID greater than this one (faster than --offset for deep pages)",
+)
+
+search_parser = subparsers.add_parser(name="search")
+search_parser.add_argument(
+    "query",
+    help="words to find in expense descriptions (supports prefix* and \"exact phrases\")",
+)
+search_parser.add_argument(
+    "-c", "--category", help="only search expenses from a given category"
+)
+search_parser.add_argument(
+    "--from",
+    dest="start",
+    type=date.fromisoformat,
+    help="only search expenses on or after a YYYY-MM-DD date",
+)
+search_parser.add_argument(
+    "--to",
+    dest="end",
+    type=date.fromisoformat,
+    help="only search expenses on or before a YYYY-MM-DD date",
+)
+search_parser.add_argument(
+    "-l", "--limit", type=int, default=20, help="the maximum number of results"
+)
 
 summary_parser = subparsers.add_parser(name="summary")
 summary_parser.add_argument(
     "-m",
     "--monthly",
     type=int,
-    help="view a summary of expenses for a given integer month (limited to the current calendar year)",
+    help="view a summary of expenses for a given integer month (defaults to the current calendar year)",
+)
+summary_parser.add_argument(
+    "-y", "--year", type=int, help="the year of the --monthly summary"
 )
 summary_parser.add_argument(
     "-c", "--category", help="view a summary of expenses from a given category"
 )
+summary_parser.add_argument(
+    "-b",
+    "--by",
+    choices=["week", "month", "quarter", "year"],
+    help="report totals per period and category instead of a single total",
+)
+summary_parser.add_argument(
+    "--from",
+    dest="start",
+    type=date.fromisoformat,
+    help="only report expenses on or after a YYYY-MM-DD date (with --by)",
+)
+summary_parser.add_argument(
+    "--to",
+    dest="end",
+    type=date.fromisoformat,
+    help="only report expenses on or before a YYYY-MM-DD date (with --by)",
+)
+summary_parser.add_argument(
+    "-f",
+    "--format",
+    choices=["table", "json", "csv"],
+    default="table",
+    help="output format of the --by report",
+)
+summary_parser.add_argument(
+    "--verify",
+    action="store_true",
+    help="check the precomputed summary totals against a full recompute",
+)
 
 update_parser = subparsers.add_parser(name="update")
-update_parser.add_argument("id", help="ID of the expense to update")
+update_parser.add_argument("id", type=int, help="ID of the expense to update")
 update_parser.add_argument("-d", "--description", help="edit the expense description")
 update_parser.add_argument("-a", "--amount", type=float, help="edit the expense amount")
 update_parser.add_argument("-c", "--category", help="edit the expense category")
 
 remove_parser = subparsers.add_parser(name="remove")
-remove_parser.add_argument("id", help="ID of the expense to remove")
+remove_parser.add_argument("id", type=int, help="ID of the expense to remove")
 
 export_parser = subparsers.add_parser(name="export")
+export_parser.add_argument(
+    "-o", "--output", default="expenses.csv", help="path to the exported .csv file"
+)
+export_parser.add_argument(
+    "--from",
+    dest="start",
+    type=date.fromisoformat,
+    help="only export expenses on or after a YYYY-MM-DD date",
+)
+export_parser.add_argument(
+    "--to",
+    dest="end",
+    type=date.fromisoformat,
+    help="only export expenses on or before a YYYY-MM-DD date",
+)
+export_parser.add_argument(
+    "-c", "--category", help="only export expenses from a given category"
+)
+export_parser.add_argument(
+    "-z", "--gzip", action="store_true", help="gzip the exported file"
+)
 
-args = parser.parse_args()
+import_parser = subparsers.add_parser(name="import")
+import_parser.add_argument("path", help="path to a .csv or .jsonl file of expenses")
+import_parser.add_argument(
+    "-f",
+    "--format",
+    choices=["csv", "jsonl"],
+    help="format of the input file (defaults to the file extension)",
+)
+import_parser.add_argument(
+    "-b",
+    "--batch-size",
+    type=int,
+    default=10000,
+    help="number of rows written per transaction",
+)
+import_parser.add_argument(
+    "-r", "--rejects", help="path to a .csv file for rows that fail validation"
+)
+
+stats_parser = subparsers.add_parser(name="stats")
+stats_parser.add_argument(
+    "--from",
+    dest="start",
+    type=date.fromisoformat,
+    help="only include expenses on or after a YYYY-MM-DD date",
+)
+stats_parser.add_argument(
+    "--to",
+    dest="end",
+    type=date.fromisoformat,
+    help="only include expenses on or before a YYYY-MM-DD date",
+)
+stats_parser.add_argument(
+    "-c", "--category", help="only include expenses from a given category"
+)
+
+serve_parser = subparsers.add_parser(name="serve")
+serve_parser.add_argument(
+    "-s",
+    "--socket",
+    default=SOCKET_PATH,
+    help="path to the unix socket the daemon listens on",
+)
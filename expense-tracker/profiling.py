@@ -0,0 +1,166 @@
+"""
+profiling.py
+
+contains the opt-in timing instrumentation for CLI commands (--profile or EXPENSES_PROFILE=1)
+"""
+
+import cProfile
+import json
+import sys
+import time
+from argparse import Namespace
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+PROFILE_ENV = "EXPENSES_PROFILE"
+
+# the sqlite progress handler fires once per this many virtual machine instructions
+VM_STEP_INTERVAL = 1000
+
+# counters for the command being profiled, None when profiling is off
+trace: dict | None = None
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Times the enclosed block and adds it to the named phase of the current trace.
+
+    Does nothing when profiling is off.
+
+    Args:
+        name (str): The name of the phase, i.e. 'connect' or 'query'.
+
+    Returns:
+        Iterator[None]
+    """
+    if trace is None:
+        yield
+
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace["phases"][name] += (time.perf_counter() - start) * 1000
+
+
+def count(counter: str, amount: int = 1) -> None:
+    """
+    Adds to a counter of the current trace, i.e. 'rows' or 'bytes_written'.
+
+    Args:
+        counter (str): The name of the counter.
+        amount (int): The amount to add.
+
+    Returns:
+        None
+    """
+    if trace is not None:
+        trace["counters"][counter] += amount
+
+
+def count_statement(sql: str) -> None:
+    """
+    Trace callback for sqlite connections that counts executed statements.
+
+    Args:
+        sql (str): The executed statement.
+
+    Returns:
+        None
+    """
+    count("statements")
+
+
+def count_vm_steps() -> int:
+    """
+    Progress handler for sqlite connections that approximates the work done by queries.
+
+    Returns:
+        int: 0, so sqlite never aborts the running query.
+    """
+    count("vm_steps", VM_STEP_INTERVAL)
+
+    return 0
+
+
+def instrument(conn) -> None:
+    """
+    Attaches the statement and work counters to a sqlite connection.
+
+    Args:
+        conn (sqlite3.Connection): An open database connection.
+
+    Returns:
+        None
+    """
+    if trace is None:
+        conn.set_trace_callback(None)
+        conn.set_progress_handler(None, 0)
+    else:
+        conn.set_trace_callback(count_statement)
+        conn.set_progress_handler(count_vm_steps, VM_STEP_INTERVAL)
+
+
+def run_profiled(
+    handler: Callable[[Namespace], None],
+    args: Namespace,
+    trace_path: str | None = None,
+    pstats_path: str | None = None,
+) -> dict:
+    """
+    Runs a command handler while recording per-phase timings and counters.
+
+    The trace is written as a single JSON line, appended to trace_path or printed to stderr.
+    Phases can nest, i.e. the first query of a command also contains its connect phase.
+
+    Args:
+        handler (Callable[[Namespace], None]): The command handler to run.
+        args (Namespace): The parsed command line fields for the handler.
+        trace_path (str): The path to a file the JSON trace is appended to.
+        pstats_path (str): The path to write cProfile stats to, readable with the pstats module.
+
+    Returns:
+        dict: The recorded trace.
+    """
+    global trace
+    # imported here since database imports this module for its hooks
+    import database
+
+    trace = {"phases": defaultdict(float), "counters": defaultdict(int)}
+    for conn in database.open_connections():
+        instrument(conn)
+
+    profiler = cProfile.Profile() if pstats_path else None
+    start = time.perf_counter()
+
+    try:
+        if profiler:
+            profiler.runcall(handler, args)
+        else:
+            handler(args)
+    finally:
+        result = {
+            "command": args.command,
+            "total_ms": round((time.perf_counter() - start) * 1000, 3),
+            "phases": {name: round(ms, 3) for name, ms in trace["phases"].items()},
+            **trace["counters"],
+        }
+        trace = None
+        for conn in database.open_connections():
+            instrument(conn)
+
+        if profiler:
+            profiler.dump_stats(pstats_path)
+
+        line = json.dumps(result)
+        if trace_path:
+            with open(trace_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        else:
+            print(line, file=sys.stderr)
+
+    return result
@@ -0,0 +1,221 @@
+"""
+reports.py
+
+contains the time-series reporting engine behind `summary --by`
+"""
+
+import csv
+import json
+from datetime import date, timedelta
+from io import StringIO
+
+from database import get_connection
+from utilities import build_expense_filters, format_amount
+
+# SQL expressions that turn a row into its period label, per bucket size
+EXPENSE_BUCKETS = {
+    "week": "strftime('%Y-W%W', date)",
+    "month": "substr(date, 1, 7)",
+    "quarter": "substr(date, 1, 4) || '-Q' || ((CAST(substr(date, 6, 2) AS INTEGER) + 2) / 3)",
+    "year": "substr(date, 1, 4)",
+}
+
+# the same labels computed from expense_rollups, for buckets made of whole months
+ROLLUP_BUCKETS = {
+    "month": "printf('%04d-%02d', year, month)",
+    "quarter": "printf('%04d-Q%d', year, (month + 2) / 3)",
+    "year": "printf('%04d', year)",
+}
+
+
+def covers_whole_months(start: date | None, end: date | None) -> bool:
+    """
+    Checks whether a date range starts and ends on month boundaries.
+
+    Args:
+        start (date): The first day of the range, or None for no lower bound.
+        end (date): The last day of the range, or None for no upper bound.
+
+    Returns:
+        bool: Whether the range only contains whole months.
+    """
+    starts_on_boundary = start is None or start.day == 1
+    ends_on_boundary = end is None or (end + timedelta(days=1)).day == 1
+
+    return starts_on_boundary and ends_on_boundary
+
+
+def query_report(
+    bucket: str,
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    db="expenses.db",
+) -> list[tuple]:
+    """
+    Aggregates expenses per period and category in a single grouped query.
+
+    Month, quarter and year reports over whole months are read from expense_rollups,
+    anything else is grouped from the expenses table using the date index.
+
+    Args:
+        bucket (str): The period size, one of 'week', 'month', 'quarter' or 'year'.
+        start (date): Only include expenses on or after this day.
+        end (date): Only include expenses on or before this day.
+        category (str): Only include expenses in this category.
+        db (str): The path to the database.
+
+    Returns:
+        list[tuple]: Rows of (period, category, total in cents), ordered by period.
+    """
+    conn = get_connection(db)
+
+    if bucket in ROLLUP_BUCKETS and covers_whole_months(start, end):
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("year * 100 + month >= ?")
+            params.append(start.year * 100 + start.month)
+        if end is not None:
+            conditions.append("year * 100 + month <= ?")
+            params.append(end.year * 100 + end.month)
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cur = conn.execute(
+            f"""
+            SELECT {ROLLUP_BUCKETS[bucket]} AS period, category, SUM(total)
+            FROM expense_rollups
+            {where}
+            GROUP BY period, category
+            ORDER BY period, category
+            """,
+            params,
+        )
+    else:
+        where, params = build_expense_filters(start, end, category)
+
+        cur = conn.execute(
+            f"""
+            SELECT {EXPENSE_BUCKETS[bucket]} AS period, IFNULL(category, ''), SUM(IFNULL(amount, 0))
+            FROM expenses
+            {where}
+            GROUP BY period, 2
+            ORDER BY period, 2
+            """,
+            params,
+        )
+
+    return cur.fetchall()
+
+
+def build_report(
+    bucket: str = "month",
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    db="expenses.db",
+) -> dict:
+    """
+    Builds a spending matrix of period by category with per-period and running totals.
+
+    Args:
+        bucket (str): The period size, one of 'week', 'month', 'quarter' or 'year'.
+        start (date): Only include expenses on or after this day.
+        end (date): Only include expenses on or before this day.
+        category (str): Only include expenses in this category.
+        db (str): The path to the database.
+
+    Returns:
+        dict: The bucket, the sorted categories, and one entry per period containing the
+        per-category totals, period total and running total, all in cents.
+    """
+    periods = {}
+    categories = set()
+
+    for period, cat, total in query_report(bucket, start, end, category, db):
+        periods.setdefault(period, {})[cat] = total
+        categories.add(cat)
+
+    rows = []
+    running_total = 0
+    for period, totals in periods.items():
+        period_total = sum(totals.values())
+        running_total += period_total
+        rows.append(
+            {
+                "period": period,
+                "categories": totals,
+                "total": period_total,
+                "running_total": running_total,
+            }
+        )
+
+    return {"bucket": bucket, "categories": sorted(categories), "periods": rows}
+
+
+def render_report(report: dict, fmt: str = "table") -> str:
+    """
+    Renders a report built by build_report.
+
+    Args:
+        report (dict): The report to render.
+        fmt (str): The output format, one of 'table', 'json' or 'csv'.
+
+    Returns:
+        str: The rendered report.
+    """
+    categories = report["categories"]
+
+    if fmt == "json":
+        return json.dumps(
+            {
+                "bucket": report["bucket"],
+                "categories": categories,
+                "periods": [
+                    {
+                        "period": row["period"],
+                        "categories": {
+                            cat: total / 100 for cat, total in row["categories"].items()
+                        },
+                        "total": row["total"] / 100,
+                        "running_total": row["running_total"] / 100,
+                    }
+                    for row in report["periods"]
+                ],
+            },
+            indent=2,
+        )
+
+    lines = [
+        [
+            row["period"],
+            *(format_amount(row["categories"].get(cat, 0)) for cat in categories),
+            format_amount(row["total"]),
+            format_amount(row["running_total"]),
+        ]
+        for row in report["periods"]
+    ]
+    header = ["Period", *(cat or "(none)" for cat in categories), "Total", "Running"]
+
+    if fmt == "csv":
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(header)
+        writer.writerows(lines)
+
+        return output.getvalue()
+
+    if not lines:
+        return "No expenses match the given filters."
+
+    widths = [
+        max(len(line[i]) for line in [header, *lines]) for i in range(len(header))
+    ]
+
+    return "\n".join(
+        " ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+        for line in [header, *lines]
+    )
@@ -0,0 +1,127 @@
+"""
+server.py
+
+contains the optional long-running daemon for the CLI and the client that forwards commands to it
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from argparse import Namespace
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+SOCKET_PATH = "expenses.sock"
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """
+    Runs newline-delimited JSON commands sent over a connection.
+
+    Each request is a JSON object with an "argv" list of CLI arguments. Each response is a
+    JSON object with the command's "output" and an "exit" status.
+    """
+
+    def handle(self) -> None:
+        from parsers import parser
+        from variables import COMMANDS
+
+        for line in self.rfile:
+            output = StringIO()
+            status = 0
+
+            with redirect_stdout(output), redirect_stderr(output):
+                try:
+                    argv = json.loads(line)["argv"]
+                    args = parser.parse_args(argv)
+
+                    if args.command == "serve":
+                        print("Error: the daemon is already running.")
+                        status = 1
+                    else:
+                        COMMANDS[args.command](args)
+                except SystemExit as e:
+                    status = e.code if isinstance(e.code, int) else 1
+                except Exception as e:
+                    print(f"Error: {e}")
+                    status = 1
+
+            response = {"output": output.getvalue(), "exit": status}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+def serve(socket_path: str = SOCKET_PATH) -> None:
+    """
+    Serves CLI commands over a unix domain socket until interrupted.
+
+    Commands are handled one at a time on a single process, so the database connection and
+    schema checks are shared by every request.
+
+    Args:
+        socket_path (str): The path to the unix domain socket.
+
+    Returns:
+        None
+    """
+    if os.path.exists(socket_path):
+        if forward(["view", "--limit", "0"], socket_path) is not None:
+            print(f"Error: a daemon is already listening on {socket_path}.")
+
+            return
+        os.unlink(socket_path)
+
+    # treat a plain `kill` like Ctrl+C so the socket file still gets cleaned up
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    with socketserver.UnixStreamServer(socket_path, CommandHandler) as server:
+        print(f"Serving expense commands on {socket_path}. Press Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def forward(argv: list[str], socket_path: str = SOCKET_PATH) -> tuple[str, int] | None:
+    """
+    Sends a command to a running daemon.
+
+    Args:
+        argv (list[str]): The CLI arguments of the command.
+        socket_path (str): The path to the daemon's unix domain socket.
+
+    Returns:
+        tuple[str, int] | None: The command output and exit status, or None if no daemon is reachable.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(json.dumps({"argv": argv}).encode() + b"\n")
+
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    return response["output"], response["exit"]
+
+
+def handle_serve(args: Namespace) -> None:
+    """
+    Handles the CLI arguments for running the daemon.
+
+    Parameters:
+        args (Namespace): Parsed command line fields containing the socket path.
+
+    Side-Effects:
+        Blocks serving commands until interrupted.
+
+    Returns:
+        None
+    """
+    serve(args.socket)
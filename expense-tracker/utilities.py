@@ -5,14 +5,38 @@ contains all functionality for the CLI
 """
 
 import csv
+import gzip
+import json
+import os
 import sqlite3
+import sys
 from argparse import Namespace
-from datetime import datetime
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta
+from decimal import InvalidOperation
+from itertools import chain
+
+import profiling
+from database import ROLLUP_QUERY, bulk_insert, get_connection, to_cents, transaction
+
+
+def format_amount(cents: int) -> str:
+    """
+    Formats integer cents as dollars for terminal output.
+
+    Args:
+        cents (int): The amount in cents.
+
+    Returns:
+        str: The amount in dollars with two decimal places.
+    """
+    return f"{cents / 100:.2f}"
 
 
 def init_db(db: str = "expenses.db") -> None:
     """
-    Implicitly creates a sqlite db if it doesn't exist, then creates an expenses table if it doesn't exist.
+    Implicitly creates a sqlite db if it doesn't exist, then migrates it to the current schema.
+    The schema is only checked once per process, see database.get_connection.
 
     Args:
         db (str): The path to the database.
@@ -20,21 +44,7 @@ def init_db(db: str = "expenses.db") -> None:
     Returns:
         None
     """
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS expenses (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        date TEXT NOT NULL,
-        description TEXT,
-        amount REAL, 
-        category TEXT
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+    get_connection(db)
 
 
 def add_expense(description: str, amount: float, category: str, db="expenses.db"):
@@ -50,87 +60,106 @@ def add_expense(description: str, amount: float, category: str, db="expenses.db"
     Returns:
         None
     """
-    init_db(db)
-
     date = datetime.today().isoformat()
 
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
+    try:
+        cents = to_cents(amount)
+    except (ArithmeticError, ValueError):
+        print(f"Error: Amount {amount} is not a valid amount of money.")
 
-    cur.execute(
-        "INSERT INTO expenses (date,description,amount,category) VALUES (?,?,?,?)",
-        (date, description, amount, category),
-    )
+        return
 
-    conn.commit()
-    conn.close()
+    with transaction(db) as conn:
+        cur = conn.execute(
+            "INSERT INTO expenses (date,description,amount,category) VALUES (?,?,?,?)",
+            (date, description, cents, category),
+        )
 
-    print(f"Expense successfully added! Current expenses:\n {view_total_expenses(db)}")
+    print(f"Expense successfully added! (ID: {cur.lastrowid})")
 
 
-def view_total_expenses(db="expenses.db") -> str:
+def view_total_expenses(
+    limit: int | None = None,
+    offset: int = 0,
+    after_id: int | None = None,
+    db="expenses.db",
+) -> Iterator[str]:
     """
-    Lists all expenses.
+    Lazily lists expenses, ordered by ID.
+
+    Rows are streamed from the database and formatted one at a time, so a page of a large table
+    costs only the rows on that page.
 
     Args:
+        limit (int): The maximum number of expenses to list. Lists every expense if None.
+        offset (int): The number of expenses to skip.
+        after_id (int): Only list expenses with an ID greater than this one (keyset pagination).
         db (str): The path to the database.
 
     Returns:
-        str: A formatted string representing the expenses table for terminal output.
+        Iterator[str]: The lines of the formatted expenses table for terminal output.
     """
-    init_db(db)
-
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
+    conn = get_connection(db)
 
-    cur.execute("""
-    SELECT * FROM expenses
-    """)
-
-    conn.commit()
-    result = cur.fetchall()
-    conn.close()
+    with profiling.phase("query"):
+        cur = conn.execute(
+            """
+            SELECT
+            id,
+            substr(date, 1, 10),
+            IFNULL(description, ''),
+            IFNULL(amount, 0),
+            IFNULL(category, '')
+            FROM expenses
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ? OFFSET ?
+            """,
+            (
+                -1 if after_id is None else after_id,
+                -1 if limit is None else limit,
+                offset,
+            ),
+        )
+        first = cur.fetchone()
 
-    if len(result) > 0:
-        header, rows = format_output(result=result)
+    if first is None:
+        yield "Empty expense table. Run the 'add' command to add expenses."
 
-        return f"{header}\n{rows}"
+        return
 
-    else:
-        return "Empty expense table. Run the 'add' command to add expenses."
+    yield from format_output(chain([first], cur))
 
 
-def summarize_all_expenses(db="expenses.db") -> float:
+def summarize_all_expenses(db="expenses.db") -> str:
     """
-    Aggregates all expenses.
+    Aggregates all expenses from the expense_rollups table.
 
     Args:
         db (str): The path to the database.
 
     Returns:
-        float: The total amount of all expenses in the database.
+        str: The total amount of all expenses in the database, with two decimal places.
     """
-    init_db(db)
-
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT SUM(amount)
-        FROM expenses 
+    conn = get_connection(db)
+    cur = conn.execute("""
+        SELECT SUM(total)
+        FROM expense_rollups
     """)
 
     result = cur.fetchone()
-    conn.close()
 
     total = result[0]
 
-    return total
+    if total is None:
+        return "Empty expense table. Run the 'add' command to add expenses."
+
+    return format_amount(total)
 
 
 def summarize_category_expenses(category, db="expenses.db") -> str:
     """
-    Aggregates expenses by category.
+    Aggregates expenses by category from the expense_rollups table.
 
     Args:
         category (str): The category of expense.
@@ -139,262 +168,267 @@ def summarize_category_expenses(category, db="expenses.db") -> str:
     Returns:
         str: A string containing the total amout of expenses for the given category.
     """
-    init_db(db)
-
-    current_categories = get_current_categories(db)
-    if category not in current_categories:
+    if not category_exists(category, db):
         print(
             f"{category} does not exist. Run the view command to see all current expenses/categories."
         )
     else:
-        conn = sqlite3.connect(db)
-        cur = conn.cursor()
-
-        cur.execute(
+        conn = get_connection(db)
+        cur = conn.execute(
             """
-            SELECT 
-            SUM(amount)
-            FROM expenses
+            SELECT
+            SUM(total)
+            FROM expense_rollups
             WHERE
             category = ?
             """,
             (category,),
         )
 
-        conn.commit()
         result = cur.fetchone()
-        conn.close()
 
         amount = result[0]
-        return f"Total expenses for {category}: {amount}"
+        return f"Total expenses for {category}: {format_amount(amount)}"
+
+
+def month_bounds(month: int, year: int | None = None) -> tuple[date, date]:
+    """
+    Returns the first and last day of a month.
 
+    Args:
+        month (int): The integer value of the month (i.e., August = 8)
+        year (int): The year of the month. Defaults to the current calendar year.
+
+    Returns:
+        tuple[date, date]: The first and last day of the month.
+
+    Raises:
+        ValueError: If the month isn't between 1 and 12.
+    """
+    year = year or datetime.now().year
+    start = date(year, month, 1)
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+    return start, next_month - timedelta(days=1)
 
-def summarize_monthly_expenses(month: int, db="expenses.db") -> None | str:
+
+def summarize_monthly_expenses(
+    month: int, year: int | None = None, db="expenses.db"
+) -> None | str:
     """
-    Aggregates expenses by a given integer month.
+    Aggregates expenses by a given integer month from the expense_rollups table.
 
     Args:
         month (int): The integer value of the expense month (i.e., August = 8)
+        year (int): The year of the expense month. Defaults to the current calendar year.
         db (str): The path to the database.
 
     Returns:
         None
         str: A message regarding the success/failure of the monthly expense check.
     """
-    init_db(db)
-
     try:
-        int(month)
+        start, _ = month_bounds(int(month), year)
     except ValueError:
         print(f"{month} is not valid. Month must be an int (i.e, 5 for 'May')")
 
         return
 
-    formatted_month = f"{month:02d}"
-    dt = datetime(year=datetime.now().year, month=int(formatted_month), day=1)
-    month_in_text = dt.strftime("%B")
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
+    month_in_text = start.strftime("%B %Y")
+    conn = get_connection(db)
 
-    cur.execute(
+    cur = conn.execute(
         """
-        SELECT 
-        SUM(amount)
-        FROM expenses
+        SELECT
+        SUM(total)
+        FROM expense_rollups
         WHERE
-        strftime('%m', date) = ?
+        year = ? AND month = ?
         """,
-        (formatted_month,),
+        (start.year, start.month),
     )
 
     result = cur.fetchone()
-    conn.close()
 
     amount = result[0]
 
     if not amount:
         return f"No expenses for the month of {month_in_text}. Run the view command to see a list of all current dates of expenses."
     else:
-        return f"Total expenses for {month_in_text}: {amount}"
+        return f"Total expenses for {month_in_text}: {format_amount(amount)}"
 
 
 def summarize_category_monthly_expenses(
-    category: str, month: int, db="expenses.db"
+    category: str, month: int, year: int | None = None, db="expenses.db"
 ) -> str:
     """
-    Summarizes expenses by category within a given month.
+    Summarizes expenses by category within a given month from the expense_rollups table.
 
     Args:
         category (str): The category to aggregate by.
         month (int): The integer month to filter by.
+        year (int): The year of the month. Defaults to the current calendar year.
+        db (str): The path to the database.
 
     Returns:
         str: A message containing the total amount of expenses within the filter criteria.
     """
-    init_db(db)
-
     try:
-        int(month)
+        start, _ = month_bounds(int(month), year)
     except ValueError:
         print(f"{month} is not valid. Month must be an int (i.e, 5 for 'May')")
 
         return
 
-    current_categories = get_current_categories(db)
-    formatted_month = f"{month:02d}"
-    dt = datetime(year=datetime.now().year, month=int(formatted_month), day=1)
-    month_in_text = dt.strftime("%B")
+    month_in_text = start.strftime("%B %Y")
 
-    if category not in current_categories:
+    if not category_exists(category, db):
         print(
             f"{category} does not exist. Run the view command to see all current expenses/categories."
         )
 
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
+    conn = get_connection(db)
 
-    cur.execute(
+    cur = conn.execute(
         """
-        SELECT 
-        SUM(amount)
-        FROM expenses
+        SELECT
+        SUM(total)
+        FROM expense_rollups
         WHERE
-        [strftime('%m', date) = ?]
-        AND
-        [category = ?]
+        year = ? AND month = ? AND category = ?
         """,
-        (formatted_month, category),
+        (start.year, start.month, category),
     )
 
     result = cur.fetchone()
-    conn.close()
 
     amount = result[0]
 
     if not amount:
         return f"No {category} expenses for the month of {month_in_text}. Run the view command to see a list of all current dates of expenses."
     else:
-        return f"Total {category} expenses for {month_in_text}: {amount}"
+        return f"Total {category} expenses for {month_in_text}: {format_amount(amount)}"
 
 
-def update_expense_description(id: int, description: str, db="expenses.db") -> str:
+def verify_rollups(db="expenses.db") -> list[tuple]:
     """
-    Updates description of expense at given ID.
+    Recomputes every rollup from the expenses table and compares it with the stored rollups.
 
     Args:
-        id (int): ID of expense to be updated.
-        description (str): Updated description.
         db (str): The path to the database.
 
     Returns:
-        str: A message indicating update success and showing current expenses table.
+        list[tuple]: The (year, month, category, stored total, recomputed total) of every mismatched rollup.
     """
-    init_db(db)
+    conn = get_connection(db)
 
-    try:
-        int(id)
-    except ValueError:
-        print(
-            "Error: ID must be an integer. Run the 'view' command to see existing expense IDs."
+    stored = {
+        (year, month, category): (total, count)
+        for year, month, category, total, count in conn.execute(
+            "SELECT year, month, category, total, count FROM expense_rollups"
         )
+    }
+    recomputed = {
+        (year, month, category): (total, count)
+        for year, month, category, total, count in conn.execute(ROLLUP_QUERY)
+    }
 
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE expenses
-        SET description = ?
-        WHERE id = ?
-        """,
-        (
-            description,
-            id,
-        ),
-    )
-    conn.commit()
-    conn.close()
+    mismatches = []
+    for key in sorted(stored.keys() | recomputed.keys()):
+        stored_total, stored_count = stored.get(key, (None, 0))
+        total, count = recomputed.get(key, (None, 0))
+
+        if stored_count != count or stored_total != total:
+            mismatches.append((*key, stored_total, total))
+
+    return mismatches
+
+
+UPDATABLE_FIELDS = ("description", "amount", "category")
 
-    return f"Description updated for expense!\n{view_total_expenses(db)}"
 
+def build_update(fields: dict) -> tuple[str, list]:
+    """
+    Builds a single parameterized UPDATE statement for the given expense fields.
+
+    Args:
+        fields (dict): The fields to update mapped to their new values. None values are skipped.
+
+    Returns:
+        tuple[str, list]: The UPDATE statement (expecting the ID as its last parameter) and the field values.
+
+    Raises:
+        ValueError: If a field isn't one of UPDATABLE_FIELDS.
+        OverflowError: If the amount doesn't fit in a sqlite INTEGER, see to_cents.
+    """
+    unknown = fields.keys() - set(UPDATABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot update unknown expense fields: {sorted(unknown)}")
+
+    columns = [name for name in UPDATABLE_FIELDS if fields.get(name) is not None]
+    assignments = ", ".join(f"{name} = ?" for name in columns)
 
-def update_expense_amount(id: int, amount: float, db="expenses.db") -> str:
+    return f"UPDATE expenses SET {assignments} WHERE id = ?", [
+        to_cents(fields[name]) if name == "amount" else fields[name]
+        for name in columns
+    ]
+
+
+def update_expense(id: int, db="expenses.db", **fields) -> str:
     """
-    Updates amount of expense at given ID.
+    Updates any combination of an expense's description, amount and category in one statement.
 
     Args:
         id (int): ID of expense to be updated.
-        amount (float): Updated amount.
         db (str): The path to the database.
+        **fields: The updated description, amount and/or category.
 
     Returns:
-        str: A message indicating update success and showing current expenses table.
+        str: A message indicating update success or failure.
     """
-    init_db(db)
-
     try:
         int(id)
     except ValueError:
-        print(
-            "Error: ID must be an integer. Run the 'view' command to see existing expense IDs."
-        )
+        return "Error: ID must be an integer. Run the 'view' command to see existing expense IDs."
 
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE expenses
-        SET amount = ?
-        WHERE id = ?
-        """,
-        (
-            amount,
-            id,
-        ),
-    )
-    conn.commit()
-    conn.close()
+    try:
+        sql, values = build_update(fields)
+    except ArithmeticError:
+        return f"Error: Amount {fields.get('amount')} is not a valid amount of money."
+    if not values:
+        return "Nothing to update."
+
+    with transaction(db) as conn:
+        cur = conn.execute(sql, (*values, id))
+
+    if cur.rowcount == 0:
+        return f"Error: ID #{id} is not valid. Run the 'view' command to see current IDs"
 
-    return f"Amount updated for expense!\n{view_total_expenses(db)}"
+    updated = [name for name in UPDATABLE_FIELDS if fields.get(name) is not None]
 
+    return f"Expense #{id} updated ({', '.join(updated)})!"
 
-def update_expense_category(id: int, category: str, db="expenses.db") -> str:
+
+def update_expenses(updates: Iterable[tuple[int, dict]], db="expenses.db") -> int:
     """
-    Updates category of expense at given ID.
+    Updates many expenses in a single transaction.
 
     Args:
-        id (int): ID of expense to be updated.
-        category (str): Updated category.
+        updates (Iterable[tuple[int, dict]]): Pairs of expense ID and the fields to update, as for update_expense.
         db (str): The path to the database.
 
     Returns:
-        str: A message indicating update success and showing current expenses table.
+        int: The number of expenses updated.
     """
-    init_db(db)
-
-    try:
-        int(id)
-    except ValueError:
-        print(
-            "Error: ID must be an integer. Run the 'view' command to see existing expense IDs."
-        )
+    updated = 0
 
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE expenses
-        SET category = ?
-        WHERE id = ?
-        """,
-        (
-            category,
-            id,
-        ),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(db) as conn:
+        for id, fields in updates:
+            sql, values = build_update(fields)
+            if values:
+                updated += conn.execute(sql, (*values, id)).rowcount
 
-    return f"Category updated for expense!\n{view_total_expenses(db)}"
+    return updated
 
 
 def remove_expense(id, db="expenses.db") -> None | str:
@@ -407,10 +441,8 @@ def remove_expense(id, db="expenses.db") -> None | str:
 
     Returns:
         None
-        str: A success message indicating removal expense at given ID. Also prints current table of expenses.
+        str: A success message indicating removal expense at given ID.
     """
-    init_db(db)
-
     try:
         int(id)
     except ValueError:
@@ -418,125 +450,389 @@ def remove_expense(id, db="expenses.db") -> None | str:
 
         return
 
-    current_ids = get_current_ids(db)
-
-    if int(id) not in current_ids:
-        print(
-            f"Error: ID #{id} is not valid. Run the 'view' command to see current IDs"
-        )
-    else:
-        conn = sqlite3.connect(db)
-        cur = conn.cursor()
-        cur.execute(
+    with transaction(db) as conn:
+        cur = conn.execute(
             """
             DELETE FROM expenses
             WHERE id = ?
             """,
             (id,),
         )
-        conn.commit()
-        conn.close()
 
-    print(
-        f"Expense at {id} removed! Current expenses tracked:\n {view_total_expenses(db)}"
-    )
+    # the delete doubles as the existence check, so an unknown ID just affects no rows
+    if cur.rowcount == 0:
+        print(
+            f"Error: ID #{id} is not valid. Run the 'view' command to see current IDs"
+        )
+
+        return
+
+    print(f"Expense at {id} removed!")
 
 
-def format_output(result: list) -> (str, str):
+def format_output(result: Iterable[tuple]) -> Iterator[str]:
     """
     Formats output for pretty printing to terminal.
 
     Args:
-        result (list): A list of fetched query items
+        result (Iterable[tuple]): Query rows of (id, YYYY-MM-DD date, description, amount in cents, category)
 
     Returns:
-        tuple[str,str]: A tuple containing the formatted table headers and table rows as strings.
+        Iterator[str]: The formatted table header, followed by one formatted line per row.
     """
-    header = (
-        f"{'ID':<4} {'Date':<12} {'Description':<20} {'Amount':<8} {'Category':<12}"
-    )
-    lines = []
-    for item in result:
-        id, date, desc, amount, cat = item
-        date = datetime.fromisoformat(date)
-        date = date.strftime("%Y-%m-%d")
-        lines.append(f"{id:<4} {date:<12} {desc:<20} ${amount:<8.2f} {cat:<12}")
-    rows = "\n".join(lines)
-    return header, rows
+    yield f"{'ID':<4} {'Date':<12} {'Description':<20} {'Amount':<8} {'Category':<12}"
+
+    for id, date, desc, amount, cat in result:
+        profiling.count("rows")
+        yield f"{id:<4} {date:<12} {desc:<20} ${amount / 100:<8.2f} {cat:<12}"
+
+
+# prefixes of the sqlite errors raised for malformed full-text queries
+FTS_QUERY_ERRORS = ("fts5:", "unterminated string", "no such column")
+
+
+def search_expenses(
+    query: str,
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    limit: int = 20,
+    db="expenses.db",
+) -> Iterator[str]:
+    """
+    Lazily lists the expenses whose description best matches a full-text query.
+
+    Queries use sqlite FTS5 syntax, i.e. `coffee`, `coff*` for prefixes, `"dinner out"` for
+    phrases, and `coffee OR tea`. Results are ranked by relevance.
+
+    Args:
+        query (str): The full-text query.
+        start (date): Only list expenses on or after this day.
+        end (date): Only list expenses on or before this day.
+        category (str): Only list expenses in this category.
+        limit (int): The maximum number of expenses to list.
+        db (str): The path to the database.
+
+    Returns:
+        Iterator[str]: The lines of the formatted expenses table for terminal output.
+    """
+    where, params = build_expense_filters(start, end, category)
+    filters = where.replace("WHERE", "AND", 1)
+
+    conn = get_connection(db)
+
+    try:
+        with profiling.phase("query"):
+            cur = conn.execute(
+                f"""
+                SELECT
+                expenses.id,
+                substr(expenses.date, 1, 10),
+                IFNULL(expenses.description, ''),
+                IFNULL(expenses.amount, 0),
+                IFNULL(expenses.category, '')
+                FROM expenses_fts
+                JOIN expenses ON expenses.id = expenses_fts.rowid
+                WHERE expenses_fts MATCH ?
+                {filters}
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (query, *params, limit),
+            )
+            first = cur.fetchone()
+    except sqlite3.OperationalError as e:
+        # malformed queries, i.e. an unbalanced quote or a dangling operator
+        if not str(e).startswith(FTS_QUERY_ERRORS):
+            raise
+
+        yield f"Error: invalid search query {query!r} ({e})."
+
+        return
+
+    if first is None:
+        yield f"No expenses match {query!r}."
+
+        return
+
+    yield from format_output(chain([first], cur))
+
+
+def build_expense_filters(
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+) -> tuple[str, list]:
+    """
+    Builds a parameterized WHERE clause for filtering expenses.
+
+    Args:
+        start (date): The first day to include.
+        end (date): The last day to include.
+        category (str): The category to include.
+
+    Returns:
+        tuple[str, list]: The WHERE clause (empty if there are no filters) and its parameters.
+    """
+    conditions = []
+    params = []
 
+    if start is not None:
+        conditions.append("date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        conditions.append("date < ?")
+        params.append((end + timedelta(days=1)).isoformat())
+    if category is not None:
+        conditions.append("category = ?")
+        params.append(category)
 
-def export_to_csv(db="expenses.db", csv_path="expenses.csv"):
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    return where, params
+
+
+def export_to_csv(
+    db="expenses.db",
+    csv_path="expenses.csv",
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    compress: bool = False,
+    chunk_size: int = 5000,
+):
     """
-    Exports all expenses to a csv file.
+    Exports expenses to a csv file.
+
+    Rows are streamed from the database in chunks, so memory use stays flat regardless of table size.
 
     Args:
         db (str): The path to the database.
         csv_path (str): The path to the csv file.
+        start (date): Only export expenses on or after this day.
+        end (date): Only export expenses on or before this day.
+        category (str): Only export expenses in this category.
+        compress (bool): Gzip the output. Also enabled by a csv_path ending in '.gz'.
+        chunk_size (int): The number of rows fetched from the database at a time.
 
     Returns:
         None
     """
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("""
-        SElECT * FROM expenses
-    """)
-    rows = cur.fetchall()
+    where, params = build_expense_filters(start, end, category)
+
+    conn = get_connection(db)
+
+    with profiling.phase("query"):
+        cur = conn.execute(
+            f"""
+            SELECT id, date, description, printf('%.2f', amount / 100.0) AS amount, category
+            FROM expenses
+            {where}
+            ORDER BY id
+            """,
+            params,
+        )
     headers = [header[0] for header in cur.description]
 
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+    if compress or csv_path.endswith(".gz"):
+        if not csv_path.endswith(".gz"):
+            csv_path = f"{csv_path}.gz"
+        f = gzip.open(csv_path, "wt", newline="", encoding="utf-8")
+    else:
+        f = open(csv_path, "w", newline="", encoding="utf-8")
+
+    exported = 0
+    with f, profiling.phase("write"):
         writer = csv.writer(f)
 
         writer.writerow(headers)
-        writer.writerow(rows)
+        while rows := cur.fetchmany(chunk_size):
+            writer.writerows(rows)
+            exported += len(rows)
 
-    conn.close()
+    profiling.count("rows", exported)
+    profiling.count("bytes_written", os.path.getsize(csv_path))
 
-    print(f"Expenses successfully exported! Path: {csv_path}")
+    print(f"{exported} expenses successfully exported! Path: {csv_path}")
 
 
-def get_current_ids(db="expenses.db") -> list:
+def read_import_rows(path: str, fmt: str) -> Iterator[dict | str]:
     """
-    Helper function for retrieving existing IDs in the expense table. Used for error validation.
+    Lazily reads expense rows from a csv or jsonl file.
 
     Args:
+        path (str): The path to the input file.
+        fmt (str): The input format, either 'csv' or 'jsonl'.
+
+    Returns:
+        Iterator[dict | str]: Each row as a dict. Lines that aren't valid JSON are yielded as the raw string.
+    """
+    # utf-8-sig drops the byte order mark spreadsheet exports often start with
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield line.rstrip("\n")
+
+
+def validate_import_row(row: dict | str) -> tuple[tuple | None, str | None]:
+    """
+    Validates a single imported row and converts it to insertable values.
+
+    Args:
+        row (dict | str): A row produced by read_import_rows.
+
+    Returns:
+        tuple[tuple | None, str | None]: The (date, description, amount in cents, category) values and None,
+        or None and the reason the row was rejected.
+    """
+    if not isinstance(row, dict):
+        return None, "invalid JSON"
+
+    try:
+        date = datetime.fromisoformat(str(row.get("date") or "")).isoformat()
+    except ValueError:
+        return None, f"invalid date: {row.get('date')!r}"
+
+    try:
+        amount = to_cents(row.get("amount"))
+    except (InvalidOperation, ValueError):
+        return None, f"invalid amount: {row.get('amount')!r}"
+    except ArithmeticError:
+        return None, f"amount out of range: {row.get('amount')!r}"
+
+    category = row.get("category")
+    if not category:
+        return None, "missing category"
+
+    description = row.get("description") or ""
+
+    return (date, str(description), amount, str(category)), None
+
+
+def import_expenses(
+    path: str,
+    fmt: str | None = None,
+    batch_size: int = 10000,
+    rejects_path: str | None = None,
+    db="expenses.db",
+) -> str:
+    """
+    Bulk imports expenses from a csv or jsonl file.
+
+    The file is streamed and written in batches, one transaction per batch, so memory use
+    stays flat regardless of file size. Rows must have date, amount and category fields,
+    description is optional.
+
+    Args:
+        path (str): The path to the input file.
+        fmt (str): The input format, either 'csv' or 'jsonl'. Inferred from the file extension if None.
+        batch_size (int): The number of rows written per transaction.
+        rejects_path (str): The path to a csv file that receives rows failing validation.
         db (str): The path to the database.
 
     Returns:
-        list[int]: A list of all current IDs within the table.
+        str: A message with the number of imported and rejected rows.
     """
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id
-        FROM expenses
-    """)
-    result = [item[0] for item in cur.fetchall()]
-    conn.close()
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+    if batch_size < 1:
+        return f"Error: batch size must be a positive integer, got {batch_size}."
+
+    imported = 0
+    rejected = 0
+    batch = []
+
+    rejects_file = (
+        open(rejects_path, "w", newline="", encoding="utf-8") if rejects_path else None
+    )
+    rejects_writer = csv.writer(rejects_file) if rejects_file else None
+    if rejects_writer:
+        rejects_writer.writerow(["row", "reason", "data"])
+
+    def flush():
+        with transaction(db) as conn, bulk_insert(conn):
+            conn.executemany(
+                "INSERT INTO expenses (date,description,amount,category) VALUES (?,?,?,?)",
+                batch,
+            )
+        batch.clear()
+
+    try:
+        for number, row in enumerate(read_import_rows(path, fmt), start=1):
+            values, reason = validate_import_row(row)
+
+            if reason:
+                rejected += 1
+                if rejects_writer:
+                    data = row if isinstance(row, str) else json.dumps(row)
+                    rejects_writer.writerow([number, reason, data])
+                continue
 
-    return result
+            batch.append(values)
+            if len(batch) >= batch_size:
+                imported += len(batch)
+                flush()
 
+        if batch:
+            imported += len(batch)
+            flush()
+    finally:
+        if rejects_file:
+            rejects_file.close()
 
-def get_current_categories(db="expenses.db"):
+    return f"Imported {imported} expenses from {path} ({rejected} rejected)."
+
+
+def expense_exists(id: int, db="expenses.db") -> bool:
     """
-    Helper function for retrieving existing categories in the expense table. Used for error validation.
+    Helper function for checking an expense ID exists. Used for error validation.
 
     Args:
+        id (int): The ID of the expense.
         db (str): The path to the database.
 
     Returns:
-        list[str]: A list of all current categories within the table
+        bool: Whether an expense with the given ID exists.
     """
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT category
-        FROM expenses
-    """)
-    result = [item[0] for item in cur.fetchall()]
-    conn.close()
+    conn = get_connection(db)
+    cur = conn.execute(
+        """
+        SELECT EXISTS (SELECT 1 FROM expenses WHERE id = ?)
+        """,
+        (id,),
+    )
+
+    return bool(cur.fetchone()[0])
+
+
+def category_exists(category: str, db="expenses.db") -> bool:
+    """
+    Helper function for checking a category exists. Used for error validation.
+
+    Args:
+        category (str): The category of expense.
+        db (str): The path to the database.
+
+    Returns:
+        bool: Whether any expense has the given category.
+    """
+    conn = get_connection(db)
+    cur = conn.execute(
+        """
+        SELECT EXISTS (SELECT 1 FROM expenses WHERE category = ?)
+        """,
+        (category,),
+    )
 
-    return result
+    return bool(cur.fetchone()[0])
 
 
 def handle_add(args: Namespace) -> None:
@@ -565,7 +861,32 @@ def handle_view(args: Namespace) -> None:
     Returns:
         None
     """
-    print(view_total_expenses())
+    with profiling.phase("render"):
+        for line in view_total_expenses(
+            limit=args.limit, offset=args.offset, after_id=args.after_id
+        ):
+            sys.stdout.write(f"{line}\n")
+            profiling.count("bytes_written", len(line) + 1)
+
+
+def handle_search(args: Namespace) -> None:
+    """
+    Handles the CLI arguments for searching expense descriptions.
+
+    Parameters:
+        args (Namespace): Parsed command line fields containing the search query and filters.
+
+    Returns:
+        None
+    """
+    for line in search_expenses(
+        args.query,
+        start=args.start,
+        end=args.end,
+        category=args.category,
+        limit=args.limit,
+    ):
+        sys.stdout.write(f"{line}\n")
 
 
 def handle_summary(args: Namespace) -> None:
@@ -578,15 +899,37 @@ def handle_summary(args: Namespace) -> None:
     Returns:
         None
     """
-    match (args.category, args.monthly):
-        case (str() as cat, int() as month):
-            print(summarize_category_monthly_expenses(cat, month))
-        case (None, int() as month):
-            print(summarize_monthly_expenses(month))
-        case (str() as cat, None):
-            print(summarize_category_expenses(cat))
-        case (None, None):
-            print(summarize_all_expenses())
+    if args.verify:
+        mismatches = verify_rollups()
+
+        if not mismatches:
+            print("Summary rollups match the expenses table.")
+        for year, month, category, stored, recomputed in mismatches:
+            print(
+                f"Rollup mismatch for {category or '(none)'} in {year}-{month:02d}: stored {stored} cents, recomputed {recomputed} cents"
+            )
+
+        return
+
+    if args.by:
+        # imported here since reports builds on the helpers in this module
+        from reports import build_report, render_report
+
+        report = build_report(args.by, args.start, args.end, args.category)
+        print(render_report(report, args.format))
+
+        return
+
+    with profiling.phase("query"):
+        match (args.category, args.monthly):
+            case (str() as cat, int() as month):
+                print(summarize_category_monthly_expenses(cat, month, args.year))
+            case (None, int() as month):
+                print(summarize_monthly_expenses(month, args.year))
+            case (str() as cat, None):
+                print(summarize_category_expenses(cat))
+            case (None, None):
+                print(summarize_all_expenses())
 
 
 def handle_update(args: Namespace) -> None:
@@ -597,30 +940,19 @@ def handle_update(args: Namespace) -> None:
         args (Namespace): Parsed command line fields containing integer ID and fields for updating.
 
     Side-Effects:
-        Updates given fields at the given ID in the databased and prints updated table to the terminal.
+        Updates given fields at the given ID in the database.
 
     Returns:
         None
     """
-    match (args.id, args.description, args.amount, args.category):
-        case (int() as id, str() as desc, float() as amount, str() as cat):
-            print(
-                update_expense_description(id, desc),
-                update_expense_amount(id, amount),
-                update_expense_category(id, cat),
-            )
-        case (int() as id, None, float() as amount, str() as cat):
-            print(update_expense_amount(id, amount), update_expense_category(id, cat))
-        case (int() as id, str() as desc, None, str() as cat):
-            print(
-                update_expense_description(id, desc), update_expense_category(id, cat)
-            )
-        case (int() as id, str() as desc, float() as amount, None):
-            print(
-                update_expense_description(id, desc), update_expense_amount(id, amount)
-            )
-        case (int() as id, None, None, None):
-            print("Nothing to update.")
+    print(
+        update_expense(
+            args.id,
+            description=args.description,
+            amount=args.amount,
+            category=args.category,
+        )
+    )
 
 
 def handle_remove(args: Namespace) -> None:
@@ -652,4 +984,33 @@ def handle_export(args: Namespace) -> None:
     Returns:
         None
     """
-    export_to_csv()
+    export_to_csv(
+        csv_path=args.output,
+        start=args.start,
+        end=args.end,
+        category=args.category,
+        compress=args.gzip,
+    )
+
+
+def handle_import(args: Namespace) -> None:
+    """
+    Handles the CLI arguments for bulk importing expenses.
+
+    Parameters:
+        args (Namespace): Parsed command line fields containing the input path and import options.
+
+    Side-Effects:
+        Adds every valid row of the input file to the database.
+
+    Returns:
+        None
+    """
+    print(
+        import_expenses(
+            args.path,
+            fmt=args.format,
+            batch_size=args.batch_size,
+            rejects_path=args.rejects,
+        )
+    )
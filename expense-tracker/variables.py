@@ -1,3 +1,5 @@
+import analytics
+import server
 import utilities
 
 COMMANDS = {
@@ -6,5 +8,9 @@ COMMANDS = {
     "update": utilities.handle_update,
     "remove": utilities.handle_remove,
     "view": utilities.handle_view,
+    "search": utilities.handle_search,
     "export": utilities.handle_export,
+    "import": utilities.handle_import,
+    "stats": analytics.handle_stats,
+    "serve": server.handle_serve,
 }
@@ -0,0 +1,154 @@
+"""
+aggregate.py
+
+contains the event aggregation engine, a reducer whose partial results can be merged
+across pages, users and worker processes
+"""
+
+import os
+from collections import Counter
+from collections.abc import Iterable
+
+from stream import iter_archives
+
+# commits, pull_requests, issues and stars are counted per repo, the rest per key in
+# their name. every counter can be summed, which is what makes summaries mergeable
+COUNTERS = (
+    "commits",
+    "pull_requests",
+    "issues",
+    "stars",
+    "repos",
+    "actors",
+    "types",
+    "days",
+)
+
+
+def empty_summary() -> dict[str, Counter]:
+    """
+    creates a summary with every counter empty
+
+    returns:
+        dict[str, Counter]: one empty Counter per entry in COUNTERS
+    """
+    return {name: Counter() for name in COUNTERS}
+
+
+def reduce_event(summary: dict[str, Counter], event: dict) -> dict[str, Counter]:
+    """
+    adds a single event to a summary
+
+    args:
+        summary (dict[str, Counter]): the summary to add to, which is updated in place
+        event (dict): a single github event object, full or projected
+
+    returns:
+        dict[str, Counter]: the updated summary
+    """
+    event_type = event["type"]
+    repo_name = event["repo"].get("name", "")
+
+    summary["types"][event_type] += 1
+    summary["repos"][repo_name] += 1
+    summary["actors"][event["actor"].get("login", "")] += 1
+    summary["days"][event["created_at"][:10]] += 1
+
+    if event_type == "PushEvent":
+        summary["commits"][repo_name] += event["payload"].get("size", 0)
+    elif event_type == "PullRequestEvent":
+        summary["pull_requests"][repo_name] += 1
+    elif event_type == "IssuesEvent":
+        summary["issues"][repo_name] += 1
+    elif event_type == "WatchEvent":
+        summary["stars"][repo_name] += 1
+
+    return summary
+
+
+def summarize(events: Iterable[dict]) -> dict[str, Counter]:
+    """
+    reduces events into a new summary
+
+    args:
+        events (Iterable[dict]): github events, i.e. a page, a user's events or an archive
+
+    returns:
+        dict[str, Counter]: the summary of the events
+    """
+    summary = empty_summary()
+    for event in events:
+        reduce_event(summary, event)
+
+    return summary
+
+
+def merge(summaries: Iterable[dict[str, Counter]]) -> dict[str, Counter]:
+    """
+    combines partial summaries, i.e. of separate pages, users or archive shards
+
+    args:
+        summaries (Iterable[dict[str, Counter]]): the summaries to combine
+
+    returns:
+        dict[str, Counter]: a new summary equal to summarizing all of their events at once
+    """
+    merged = empty_summary()
+    for summary in summaries:
+        for name, counter in summary.items():
+            merged[name].update(counter)
+
+    return merged
+
+
+def replay_archive(
+    path: str, usernames: list[str] | None = None
+) -> tuple[list[dict], dict[str, Counter]]:
+    """
+    reads and summarizes a single archived event dump
+
+    args:
+        path (str): a JSON array or JSON lines file of github events, optionally gzipped
+        usernames (list[str] | None): only keep events by these users, if given
+
+    returns:
+        tuple[list[dict], dict[str, Counter]]: the projected events and their summary
+    """
+    events = list(iter_archives([path], usernames))
+
+    return events, summarize(events)
+
+
+def replay_archives(
+    paths: list[str], usernames: list[str] | None = None, workers: int | None = None
+) -> tuple[list[dict], dict[str, Counter]]:
+    """
+    reads and summarizes many archived event dumps on a pool of processes, one dump per
+    task, then joins the events in file order and merges the partial summaries
+
+    args:
+        paths (list[str]): the archive shards, i.e. one file per user or per hour
+        usernames (list[str] | None): only keep events by these users, if given
+        workers (int | None): the number of processes, defaulting to one per CPU
+
+    returns:
+        tuple[list[dict], dict[str, Counter]]: the projected events of every archive
+        and their summary
+    """
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    if workers <= 1:
+        results = [replay_archive(path, usernames) for path in paths]
+    else:
+        # multiprocessing is slow to import and only worth it for several archives
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(partial(replay_archive, usernames=usernames), paths)
+            )
+
+    events = [event for shard, _ in results for event in shard]
+
+    return events, merge(summary for _, summary in results)
@@ -0,0 +1,124 @@
+"""
+parse.py
+
+compares loading an archived event dump with json.load against streaming it with stream.py
+
+usage:
+    python3 benchmarks/parse.py --events 100000
+    python3 benchmarks/parse.py --dump events.json
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from stream import iter_events  # noqa: E402
+
+
+def generate_dump(path: str, events: int) -> None:
+    """
+    writes a JSON array of events made by repeating the checked-in sample with new ids
+
+    args:
+        path (str): the file to write
+        events (int): the number of events in the dump
+
+    returns:
+        None
+    """
+    with open(ROOT / "github-activity.json", encoding="utf-8") as f:
+        sample = json.load(f)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(events):
+            event = dict(sample[i % len(sample)], id=str(10**11 - i))
+            f.write(("," if i else "") + json.dumps(event))
+        f.write("]")
+
+
+def load_all(path: str) -> int:
+    """
+    parses a dump into a list of complete events in one call
+
+    args:
+        path (str): the dump to parse
+
+    returns:
+        int: the number of events
+    """
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)
+
+    return sum(1 for event in events if event["type"])
+
+
+def stream_projected(path: str) -> int:
+    """
+    parses a dump one event at a time, keeping only the handled fields
+
+    args:
+        path (str): the dump to parse
+
+    returns:
+        int: the number of events
+    """
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for event in iter_events(f) if event["type"])
+
+
+def measure(fn: Callable[[str], int], path: str) -> dict:
+    """
+    times a parser, then runs it again under tracemalloc to find its peak memory
+
+    args:
+        fn (Callable[[str], int]): the parser to measure
+        path (str): the dump to parse
+
+    returns:
+        dict: the event count, events per second and peak traced memory in megabytes
+    """
+    start = time.perf_counter()
+    events = fn(path)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "events": events,
+        "seconds": round(seconds, 3),
+        "events_per_second": round(events / seconds),
+        "peak_mb": round(peak / 1024**2, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-n", "--events", type=int, default=100_000)
+    parser.add_argument("-d", "--dump", help="an existing dump to parse instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.dump or os.path.join(tmp, "events.json")
+        if not args.dump:
+            generate_dump(path, args.events)
+
+        results = {
+            "dump_mb": round(os.path.getsize(path) / 1024**2, 1),
+            "json_load": measure(load_all, path),
+            "stream_projected": measure(stream_projected, path),
+        }
+
+    print(json.dumps(results, indent=2))
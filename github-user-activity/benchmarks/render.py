@@ -0,0 +1,114 @@
+"""
+render.py
+
+compares printing events one at a time against the batched render pipeline, on events
+replayed from an archived dump
+
+usage:
+    python3 benchmarks/render.py --events 1000000
+    python3 benchmarks/render.py --dump events.json
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aggregate import summarize  # noqa: E402
+from handlers import EVENT_HANDLERS  # noqa: E402
+from parse import generate_dump  # noqa: E402
+from render import render  # noqa: E402
+from stream import iter_events  # noqa: E402
+
+
+def print_per_event(events: list[dict], summary: dict) -> None:
+    """
+    prints events the way the CLI used to, with a handler lookup and a print per event
+
+    args:
+        events (list[dict]): github events
+        summary (dict): the summary of the events
+
+    returns:
+        None
+    """
+    for event in events:
+        handler = EVENT_HANDLERS.get(event["type"])
+        if handler:
+            print(handler(event))
+
+    for repo, count in summary["commits"].items():
+        print(f"pushed {count} commits to {repo}\n")
+
+
+def write_rendered(events: list[dict], summary: dict, fmt: str) -> None:
+    """
+    renders events in batches and writes them in a single call
+
+    args:
+        events (list[dict]): github events
+        summary (dict): the summary of the events
+        fmt (str): the output format
+
+    returns:
+        None
+    """
+    sys.stdout.write(render(events, summary, fmt))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-n", "--events", type=int, default=200_000)
+    parser.add_argument("-d", "--dump", help="an existing dump to replay instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.dump or os.path.join(tmp, "events.json")
+        if not args.dump:
+            generate_dump(path, args.events)
+
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as f:
+            events = list(iter_events(f))
+        summary = summarize(events)
+        load_seconds = time.perf_counter() - start
+
+    runs = {
+        "print_per_event": lambda: print_per_event(events, summary),
+        "render_text": lambda: write_rendered(events, summary, "text"),
+        "render_jsonl": lambda: write_rendered(events, summary, "jsonl"),
+    }
+
+    results = {"events": len(events), "load_seconds": round(load_seconds, 3)}
+
+    # output goes through a real pipe to `cat`. a terminal flushes stdout after every
+    # line, which line buffering reproduces, while a pipe or file is block buffered
+    for stdout, buffering in (("terminal", 1), ("pipe", -1)):
+        for name, run in runs.items():
+            cat = subprocess.Popen(
+                ["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL
+            )
+            with open(
+                cat.stdin.fileno(), "w", buffering=buffering, closefd=False
+            ) as out:
+                start = time.perf_counter()
+                with redirect_stdout(out):
+                    run()
+                    out.flush()
+                seconds = time.perf_counter() - start
+            cat.stdin.close()
+            cat.wait()
+
+            results[f"{name}_{stdout}"] = {
+                "seconds": round(seconds, 3),
+                "events_per_second": round(len(events) / seconds),
+            }
+
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,131 @@
+"""
+startup.py
+
+checks that importing the CLI stays free of side effects and within its startup budget
+
+usage:
+    python3 benchmarks/startup.py
+    python3 benchmarks/startup.py --budget-ms 40
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# modules that only the code paths needing them may import
+LAZY_MODULES = ("json", "urllib.request", "sqlite3", "gzip", "multiprocessing")
+
+
+def import_time_ms(statement: str) -> float:
+    """
+    measures the cumulative import time of the modules a statement imports
+
+    args:
+        statement (str): the python statement to run, i.e. 'import main'
+
+    returns:
+        float: the summed import time of the top-level imports in milliseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented and already counted in their parent's cumulative
+        if not name.startswith("  "):
+            total += int(cumulative)
+
+    return total / 1000
+
+
+def loaded_modules(statement: str) -> set[str]:
+    """
+    lists the lazily loaded modules that a statement imports anyway
+
+    args:
+        statement (str): the python statement to run
+
+    returns:
+        set[str]: the members of LAZY_MODULES found in sys.modules afterwards
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{statement}; import sys; print(' '.join(sys.modules))",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return set(result.stdout.split()) & set(LAZY_MODULES)
+
+
+def wall_time_ms(argv: list[str], runs: int) -> float:
+    """
+    measures the median wall time of a CLI invocation
+
+    args:
+        argv (list[str]): the CLI arguments
+        runs (int): the number of invocations
+
+    returns:
+        float: the median wall time in milliseconds
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py", *argv],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times) * 1000
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=30,
+        help="the most `import main` may take, including interpreter startup imports",
+    )
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    # importing without CLI arguments fails if any module parses argv on import
+    import_ms = min(import_time_ms("import main") for _ in range(args.runs))
+    eager = loaded_modules("import main")
+    results = {
+        "import_main_ms": round(import_ms, 1),
+        "eagerly_loaded": sorted(eager),
+        "replay_sample_ms": round(
+            wall_time_ms(["--from-file", "github-activity.json"], args.runs), 1
+        ),
+        "help_ms": round(wall_time_ms(["--help"], args.runs), 1),
+        "budget_ms": args.budget_ms,
+    }
+    print(json.dumps(results, indent=2))
+
+    if import_ms > args.budget_ms or eager:
+        sys.exit(1)
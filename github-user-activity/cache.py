@@ -0,0 +1,195 @@
+"""
+cache.py
+
+contains the on-disk HTTP cache that turns repeated API requests into conditional requests
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from email.message import Message
+from pathlib import Path
+
+
+class HTTPCache:
+    """
+    stores response bodies on disk with the validators github sends for them.
+
+    a response younger than the ttl is served without a request. an older one is
+    revalidated with If-None-Match/If-Modified-Since, and github answers an unchanged
+    resource with an empty 304 that doesn't count against the rate limit. once the
+    cache grows past max_bytes, the least recently validated entries are evicted.
+    """
+
+    def __init__(self, directory: str, ttl: float = 60, max_bytes: int = 64 * 1024**2):
+        """
+        args:
+            directory (str): the directory entries are stored in, created if missing
+            ttl (float): the seconds an entry is served without revalidating it
+            max_bytes (int): the total size of entries kept before evicting the oldest
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        # size and last validation time of every entry, so eviction never rescans the disk
+        self.entries: dict[Path, tuple[int, float]] = {}
+        for path in self.directory.glob("*.json"):
+            stat = path.stat()
+            self.entries[path] = (stat.st_size, stat.st_mtime)
+        self.size = sum(size for size, _ in self.entries.values())
+
+    def path(self, url: str) -> Path:
+        """
+        returns the file an entry for a url is stored in
+
+        args:
+            url (str): the requested url
+
+        returns:
+            Path: the entry's file
+        """
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str) -> dict | None:
+        """
+        reads the entry for a url
+
+        args:
+            url (str): the requested url
+
+        returns:
+            dict | None: the stored validators, Link header, storage time and body, if any
+        """
+        try:
+            with open(self.path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        checks whether an entry can be served without revalidating it
+
+        args:
+            entry (dict): an entry returned by get
+
+        returns:
+            bool: whether the entry is younger than the ttl, or than the X-Poll-Interval
+            github sent with it if that is longer
+        """
+        max_age = max(self.ttl, entry.get("poll_interval") or 0)
+
+        return time.time() - entry["stored_at"] < max_age
+
+    def conditional_headers(self, entry: dict | None) -> dict[str, str]:
+        """
+        builds the headers that ask the server to only send a changed resource
+
+        args:
+            entry (dict | None): the entry for the requested url, if any
+
+        returns:
+            dict[str, str]: the If-None-Match and If-Modified-Since headers the entry allows
+        """
+        headers = {}
+        if entry is None:
+            return headers
+
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def store(self, url: str, response_headers: Message, body: str) -> dict:
+        """
+        writes a response to the cache, evicting old entries if the cache is full
+
+        args:
+            url (str): the requested url
+            response_headers (Message): the headers of the response
+            body (str): the decoded response body
+
+        returns:
+            dict: the stored entry
+        """
+        entry = {
+            "url": url,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "link": response_headers.get("Link"),
+            "poll_interval": int(response_headers.get("X-Poll-Interval") or 0),
+            "stored_at": time.time(),
+            "body": body,
+        }
+        self.write(url, entry)
+
+        return entry
+
+    def revalidated(self, url: str, entry: dict) -> dict:
+        """
+        restarts the ttl of an entry after the server answered 304 Not Modified
+
+        args:
+            url (str): the requested url
+            entry (dict): the entry for the url
+
+        returns:
+            dict: the updated entry
+        """
+        entry["stored_at"] = time.time()
+        self.write(url, entry)
+
+        return entry
+
+    def write(self, url: str, entry: dict) -> None:
+        """
+        atomically replaces the file of an entry and updates the eviction index
+
+        args:
+            url (str): the requested url
+            entry (dict): the entry to write
+
+        returns:
+            None
+        """
+        path = self.path(url)
+        data = json.dumps(entry).encode()
+
+        # write then rename, so concurrent readers never see a partial entry
+        temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+        with self.lock:
+            previous = self.entries.get(path)
+            self.size += len(data) - (previous[0] if previous else 0)
+            self.entries[path] = (len(data), entry["stored_at"])
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        removes the least recently validated entries until the cache fits in max_bytes.
+
+        callers must hold self.lock
+
+        returns:
+            None
+        """
+        if self.size <= self.max_bytes:
+            return
+
+        oldest_first = sorted(self.entries.items(), key=lambda item: item[1][1])
+        for path, (size, _) in oldest_first:
+            if self.size <= self.max_bytes:
+                break
+
+            path.unlink(missing_ok=True)
+            del self.entries[path]
+            self.size -= size
@@ -0,0 +1,384 @@
+"""
+client.py
+
+contains the keep-alive HTTP client that reuses connections per host and requests gzip
+"""
+
+import base64
+import http.client
+import io
+import threading
+import zlib
+from email.message import Message
+from urllib.error import HTTPError, URLError
+from urllib.parse import SplitResult, unquote, urljoin, urlsplit
+from urllib.request import Request, getproxies, proxy_bypass
+
+# the bytes read from a socket at a time while decompressing
+READ_SIZE = 64 * 1024
+# sent when the request has no User-Agent, since http.client doesn't add one like urllib
+USER_AGENT = "github-user-activity"
+# the statuses that are followed to their Location, and how many times in a row
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 10
+# errors that mean an idle connection was closed by the server before it was reused
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class PooledResponse:
+    """
+    a response whose body is decompressed while it is read. once the body has been read,
+    its connection goes back to the client's pool for the next request to the same host
+    """
+
+    def __init__(
+        self,
+        client: "HTTPClient",
+        key: tuple[str, str],
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ):
+        self.client = client
+        self.key = key
+        self.connection = connection
+        self.response = response
+        self.status = response.status
+        self.headers: Message = response.headers
+        self.released = False
+
+        self.decompressor = None
+        if response.headers.get("Content-Encoding", "").lower() == "gzip":
+            # 16 + MAX_WBITS makes zlib expect a gzip header and trailer
+            self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def read(self) -> bytes:
+        """
+        reads and decompresses the rest of the body, then returns the connection to the pool
+
+        returns:
+            bytes: the decompressed body
+
+        raises:
+            URLError: if the connection fails or times out while reading, or the gzip
+                body is corrupt
+        """
+        chunks = []
+        try:
+            while chunk := self.response.read(READ_SIZE):
+                self.client.count_bytes(len(chunk))
+                if self.decompressor:
+                    chunk = self.decompressor.decompress(chunk)
+                chunks.append(chunk)
+            if self.decompressor:
+                chunks.append(self.decompressor.flush())
+        except (OSError, http.client.HTTPException, zlib.error) as e:
+            self.release(reusable=False)
+            raise URLError(e) from e
+
+        self.release(reusable=not self.response.will_close)
+
+        return b"".join(chunks)
+
+    def release(self, reusable: bool) -> None:
+        """
+        hands the connection back to the client, once
+
+        args:
+            reusable (bool): whether the connection can carry another request
+
+        returns:
+            None
+        """
+        if self.released:
+            return
+
+        self.released = True
+        self.client.release(self.key, self.connection, reusable)
+
+    def close(self) -> None:
+        """
+        closes the connection if the body wasn't read, since it can't be reused mid-body
+
+        returns:
+            None
+        """
+        self.release(reusable=False)
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class HTTPClient:
+    """
+    sends GET requests over a pool of keep-alive connections per host.
+
+    every request asks for gzip and the response is decompressed as it streams in.
+    like urllib's urlopen, so the client can be used in its place, it honours the
+    http_proxy/https_proxy/no_proxy environment variables, follows redirects, and raises
+    HTTPError for responses that aren't successful and URLError for connection failures.
+    """
+
+    def __init__(self, timeout: float = 10.0):
+        """
+        args:
+            timeout (float): the seconds to wait to connect and for each read
+        """
+        self.timeout = timeout
+        self.proxies = getproxies()
+        self.lock = threading.Lock()
+        self.idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+
+        self.connections_opened = 0
+        self.requests = 0
+        self.bytes_received = 0
+
+    def acquire(
+        self, key: tuple[str, str]
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        takes an idle connection to a host from the pool, or opens a new one
+
+        args:
+            key (tuple[str, str]): the scheme and host of the request
+
+        returns:
+            tuple[http.client.HTTPConnection, bool]: the connection, and whether it was
+            already open
+        """
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.connections_opened += 1
+
+        scheme, host = key
+        proxy = self.proxy(key)
+
+        if proxy is None:
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, timeout=self.timeout), False
+
+            return http.client.HTTPConnection(host, timeout=self.timeout), False
+
+        if scheme == "https":
+            # tunnel through the proxy with CONNECT, so TLS still ends at the host
+            connection = http.client.HTTPSConnection(
+                proxy.hostname, proxy.port, timeout=self.timeout
+            )
+            connection.set_tunnel(host, headers=self.proxy_headers(proxy))
+
+            return connection, False
+
+        connection = http.client.HTTPConnection(
+            proxy.hostname, proxy.port, timeout=self.timeout
+        )
+
+        return connection, False
+
+    def proxy(self, key: tuple[str, str]) -> SplitResult | None:
+        """
+        finds the proxy that requests to a host go through, from *_proxy variables
+
+        args:
+            key (tuple[str, str]): the scheme and host of the request
+
+        returns:
+            SplitResult | None: the parsed proxy url, or None to connect directly
+        """
+        scheme, host = key
+        proxy = self.proxies.get(scheme)
+        if not proxy or proxy_bypass(host):
+            return None
+
+        # like urllib, a proxy given without a scheme, i.e. proxy:3128, is an http proxy
+        return urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+    def proxy_headers(self, proxy: SplitResult) -> dict[str, str]:
+        """
+        builds the basic auth header for a proxy url with credentials in it
+
+        args:
+            proxy (SplitResult): the parsed proxy url
+
+        returns:
+            dict[str, str]: the Proxy-Authorization header, if the proxy has credentials
+        """
+        if proxy.username is None:
+            return {}
+
+        credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+        token = base64.b64encode(credentials.encode()).decode()
+
+        return {"Proxy-Authorization": f"Basic {token}"}
+
+    def release(
+        self,
+        key: tuple[str, str],
+        connection: http.client.HTTPConnection,
+        reusable: bool,
+    ) -> None:
+        """
+        returns a connection to the pool, or closes it if it can't be reused
+
+        args:
+            key (tuple[str, str]): the scheme and host of the connection
+            connection (http.client.HTTPConnection): the connection
+            reusable (bool): whether the connection can carry another request
+
+        returns:
+            None
+        """
+        if not reusable:
+            connection.close()
+
+            return
+
+        with self.lock:
+            self.idle.setdefault(key, []).append(connection)
+
+    def count_bytes(self, amount: int) -> None:
+        """
+        adds to the count of body bytes received over the wire, before decompression
+
+        args:
+            amount (int): the number of bytes
+
+        returns:
+            None
+        """
+        with self.lock:
+            self.bytes_received += amount
+
+    def urlopen(self, request: Request) -> PooledResponse:
+        """
+        sends a GET request, reusing an idle connection to the host if there is one, and
+        follows redirects
+
+        args:
+            request (Request): the request to send
+
+        returns:
+            PooledResponse: the response, to be read within a with block
+
+        raises:
+            HTTPError: for any response that isn't a 2xx, including 304 Not Modified
+            URLError: if the host can't be reached or the connection fails
+        """
+        url = request.full_url
+        headers = dict(request.header_items()) | {"Accept-Encoding": "gzip"}
+        # urllib capitalizes header names, i.e. User-agent, so compare case-insensitively
+        if not any(name.lower() == "user-agent" for name in headers):
+            headers["User-Agent"] = USER_AGENT
+
+        for _ in range(MAX_REDIRECTS + 1):
+            pooled = self.send(url, headers)
+            location = pooled.headers.get("Location")
+            if pooled.status not in REDIRECT_STATUSES or not location:
+                break
+
+            pooled.read()
+            target = urljoin(url, location)
+            # credentials are only sent to the host they were given for
+            if urlsplit(target).netloc != urlsplit(url).netloc:
+                headers = {
+                    name: value
+                    for name, value in headers.items()
+                    if name.lower() != "authorization"
+                }
+            url = target
+        else:
+            raise HTTPError(
+                url, pooled.status, "too many redirects", pooled.headers, None
+            )
+
+        if not 200 <= pooled.status < 300:
+            body = pooled.read()
+            raise HTTPError(
+                url,
+                pooled.status,
+                pooled.response.reason,
+                pooled.headers,
+                io.BytesIO(body),
+            )
+
+        return pooled
+
+    def send(self, url: str, headers: dict[str, str]) -> PooledResponse:
+        """
+        sends a single GET request without following redirects
+
+        args:
+            url (str): the url to request
+            headers (dict[str, str]): the request headers
+
+        returns:
+            PooledResponse: the response, whatever its status
+
+        raises:
+            URLError: if the host can't be reached or the connection fails
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        proxy = self.proxy(key)
+
+        if proxy is not None and parts.scheme == "http":
+            # a plain http proxy is sent the absolute url rather than just the path
+            path = parts._replace(fragment="").geturl()
+            headers = headers | self.proxy_headers(proxy)
+        else:
+            path = f"{parts.path}?{parts.query}" if parts.query else parts.path or "/"
+
+        while True:
+            connection, reused = self.acquire(key)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                # the server closed the idle connection, so try again on another one
+                if reused:
+                    continue
+                raise URLError(e) from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise URLError(e) from e
+            break
+
+        with self.lock:
+            self.requests += 1
+
+        return PooledResponse(self, key, connection, response)
+
+    def close(self) -> None:
+        """
+        closes every idle connection
+
+        returns:
+            None
+        """
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+    def metrics(self) -> dict:
+        """
+        summarizes the connection reuse and bytes on the wire so far
+
+        returns:
+            dict: connections opened, requests sent and compressed body bytes received
+        """
+        with self.lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "requests_sent": self.requests,
+                "bytes_received": self.bytes_received,
+            }
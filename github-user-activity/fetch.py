@@ -0,0 +1,311 @@
+"""
+fetch.py
+
+contains the concurrent fetch engine that follows github API pagination for many users
+"""
+
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+from urllib.request import Request, urlopen
+
+from cache import HTTPCache
+from scheduler import RateLimiter
+
+# the most requests sent to a single host at once, however many workers are running
+HOST_CONCURRENCY = 4
+# the largest page size the events API allows
+PER_PAGE = 100
+
+host_limits: dict[str, threading.BoundedSemaphore] = {}
+host_limits_lock = threading.Lock()
+
+
+def host_limit(url: str) -> threading.BoundedSemaphore:
+    """
+    returns the semaphore that bounds concurrent requests to the host of a url
+
+    args:
+        url (str): the url about to be requested
+
+    returns:
+        threading.BoundedSemaphore: the semaphore shared by every request to the same host
+    """
+    host = urlsplit(url).netloc
+
+    with host_limits_lock:
+        if host not in host_limits:
+            host_limits[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+
+        return host_limits[host]
+
+
+def events_url(username: str, api_url: str) -> str:
+    """
+    builds the url of the first page of a user's public events
+
+    args:
+        username (str): a github username
+        api_url (str): the base url of the github API
+
+    returns:
+        str: the url of the first page of events
+    """
+    return f"{api_url}/users/{username}/events?per_page={PER_PAGE}&page=1"
+
+
+def page_url(url: str, page: int) -> str:
+    """
+    replaces the page number in a paginated url
+
+    args:
+        url (str): any page url from a Link header
+        page (int): the page number to request
+
+    returns:
+        str: the url of the given page
+    """
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    query["page"] = [str(page)]
+
+    return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def parse_link_header(header: str | None) -> dict[str, str]:
+    """
+    parses a Link header into its relations, i.e. 'next' and 'last'
+
+    args:
+        header (str | None): the value of the Link header, if the response had one
+
+    returns:
+        dict[str, str]: the url of each relation
+    """
+    links = {}
+    if not header:
+        return links
+
+    for part in header.split(","):
+        target, _, params = part.partition(";")
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "rel":
+                for rel in value.strip('"').split():
+                    links[rel] = target.strip().strip("<>")
+
+    return links
+
+
+def last_page(links: dict[str, str]) -> int | None:
+    """
+    reads the number of the last page from parsed Link relations
+
+    args:
+        links (dict[str, str]): the relations returned by parse_link_header
+
+    returns:
+        int | None: the last page number, or None if the response didn't say
+    """
+    if "last" not in links:
+        return None
+
+    page = parse_qs(urlsplit(links["last"]).query).get("page")
+
+    return int(page[0]) if page else None
+
+
+def fetch_page(
+    url: str,
+    headers: dict[str, str],
+    cache: HTTPCache | None = None,
+    limiter: RateLimiter | None = None,
+) -> tuple[list[dict], dict[str, str]]:
+    """
+    fetches a single page of events, revalidating a cached copy when there is one
+
+    args:
+        url (str): the url of the page
+        headers (dict[str, str]): the request headers
+        cache (HTTPCache | None): the cache to serve and store responses with
+        limiter (RateLimiter | None): the scheduler that paces and retries requests
+
+    returns:
+        tuple[list[dict], dict[str, str]]: the events on the page and its Link relations
+    """
+    entry = cache.get(url) if cache else None
+    if entry is not None and cache.is_fresh(entry):
+        return json.loads(entry["body"]), parse_link_header(entry["link"])
+
+    conditional = cache.conditional_headers(entry) if cache else {}
+    request = Request(url, headers=headers | conditional)
+    opener = limiter.urlopen if limiter else urlopen
+
+    try:
+        with host_limit(url), opener(request) as response:
+            body = response.read().decode()
+            link = response.headers.get("Link")
+            if cache:
+                cache.store(url, response.headers, body)
+    except HTTPError as e:
+        # urllib raises for 304 Not Modified, which means the cached body is still current
+        if e.code != 304 or entry is None:
+            raise
+        cache.revalidated(url, entry)
+        body, link = entry["body"], entry["link"]
+
+    return json.loads(body), parse_link_header(link)
+
+
+def fetch_page_events(
+    url: str,
+    headers: dict[str, str],
+    cache: HTTPCache | None = None,
+    limiter: RateLimiter | None = None,
+) -> list[dict]:
+    """
+    fetches a single page of events when its Link relations are already known
+
+    args:
+        url (str): the url of the page
+        headers (dict[str, str]): the request headers
+        cache (HTTPCache | None): the cache to serve and store responses with
+        limiter (RateLimiter | None): the scheduler that paces and retries requests
+
+    returns:
+        list[dict]: the events on the page
+    """
+    return fetch_page(url, headers, cache, limiter)[0]
+
+
+def report_error(username: str, error: URLError | ValueError) -> None:
+    """
+    prints to the terminal why a user's events couldn't be fetched
+
+    args:
+        username (str): the github username being fetched
+        error (URLError | ValueError): the error raised by urlopen, or by a response
+            whose body or headers couldn't be parsed
+
+    returns:
+        None
+    """
+    if isinstance(error, HTTPError):
+        print(f"error: {username} - {error.code} - {error.reason}")
+    elif isinstance(error, URLError):
+        print(f"error: {username} - {error.reason}")
+    else:
+        print(f"error: {username} - invalid response: {error}")
+
+
+def follow_next(
+    links: dict[str, str],
+    headers: dict[str, str],
+    cache: HTTPCache | None = None,
+    limiter: RateLimiter | None = None,
+) -> list[dict]:
+    """
+    fetches pages one after another by following 'next' relations
+
+    used when a response links to a next page without saying which page is the last
+
+    args:
+        links (dict[str, str]): the relations of the page already fetched
+        headers (dict[str, str]): the request headers
+        cache (HTTPCache | None): the cache to serve and store responses with
+        limiter (RateLimiter | None): the scheduler that paces and retries requests
+
+    returns:
+        list[dict]: the events of every following page, in order
+    """
+    events = []
+    while "next" in links:
+        page, links = fetch_page(links["next"], headers, cache, limiter)
+        events.extend(page)
+
+    return events
+
+
+def fetch_events(
+    usernames: list[str],
+    api_url: str,
+    headers: dict[str, str],
+    workers: int = 8,
+    cache: HTTPCache | None = None,
+    limiter: RateLimiter | None = None,
+    since: dict[str, int] | None = None,
+) -> dict[str, list[dict]]:
+    """
+    fetches every page of events for many users on a shared pool of threads
+
+    the first page of every user is requested at once. the Link header of each first page
+    gives the number of the last page, so the remaining pages are then requested at once too.
+    requests to the same host never exceed HOST_CONCURRENCY. a user whose first page already
+    reaches an event in since has no new events on later pages, so those aren't requested.
+
+    args:
+        usernames (list[str]): the github usernames to fetch events for
+        api_url (str): the base url of the github API
+        headers (dict[str, str]): the request headers
+        workers (int): the number of requests in flight across all hosts
+        cache (HTTPCache | None): the cache to serve and store responses with
+        limiter (RateLimiter | None): the scheduler that paces and retries requests
+        since (dict[str, int] | None): the newest already stored event id of each user
+
+    returns:
+        dict[str, list[dict]]: the events of each user, newest first. users whose
+        request failed, or whose response couldn't be parsed, map to an empty list.
+    """
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        first_pages = {
+            username: executor.submit(
+                fetch_page, events_url(username, api_url), headers, cache, limiter
+            )
+            for username in usernames
+        }
+
+        remaining: dict[str, list[Future]] = {}
+        for username, future in first_pages.items():
+            try:
+                events, links = future.result()
+            except (URLError, ValueError) as e:
+                report_error(username, e)
+                results[username] = []
+                continue
+
+            results[username] = events
+            known = since.get(username) if since else None
+            last = last_page(links)
+            if known is not None and any(int(event["id"]) <= known for event in events):
+                continue
+            if last is not None:
+                remaining[username] = [
+                    executor.submit(
+                        fetch_page_events,
+                        page_url(links["last"], page),
+                        headers,
+                        cache,
+                        limiter,
+                    )
+                    for page in range(2, last + 1)
+                ]
+            elif "next" in links:
+                remaining[username] = [
+                    executor.submit(follow_next, links, headers, cache, limiter)
+                ]
+
+        for username, futures in remaining.items():
+            for future in futures:
+                try:
+                    page = future.result()
+                except (URLError, ValueError) as e:
+                    report_error(username, e)
+                    break
+
+                results[username].extend(page)
+
+    return results
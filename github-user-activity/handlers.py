@@ -2,7 +2,8 @@
 handlers.py
 
 uses current github API event types as dictionary keys and
-matches them with corresponding function handlers as values
+matches them with corresponding function handlers as values.
+push events aren't listed since they are summarized per repo by aggregate.py
 """
 
 import utilities
@@ -21,7 +22,6 @@ EVENT_HANDLERS = {
     "PullRequestReviewEvent": utilities.get_pull_request_review_events,
     "PullRequestReviewCommentEvent": utilities.get_pull_request_review_comment_events,
     "PullRequestReviewThreadEvent": utilities.get_pull_request_review_thread_events,
-    "PushEvent": utilities.get_push_events,
     "ReleaseEvent": utilities.get_release_events,
     "SponsorshipEvent": utilities.get_sponsorship_events,
     "WatchEvent": utilities.get_watch_events,
@@ -2,27 +2,117 @@
 main.py
 
 entry point for the github user activity CLI.
-fetches and displays recent activity for a given github username
+fetches, or replays from archived files, and displays activity for github usernames
 
 see README.md for more details
 """
 
-import utilities
-from handlers import EVENT_HANDLERS
-from variables import json_file, push_count, req
+import sys
+import time
+from argparse import Namespace
+from collections import Counter
+
+from parsers import parse_args
+from variables import api_url, cache_dir, events_db, headers
+
+
+def replay_events(args: Namespace) -> tuple[list[dict], dict[str, Counter], dict]:
+    """
+    reads and summarizes events from archived files instead of the API, one process per
+    file when there are several
+
+    args:
+        args (Namespace): the parsed CLI arguments
+
+    returns:
+        tuple[list[dict], dict[str, Counter], dict]: the projected events, their summary
+        and the parse metrics
+    """
+    from aggregate import replay_archives
+    from stream import archive_paths
+
+    paths = args.from_file + (archive_paths(args.from_dir) if args.from_dir else [])
+
+    started = time.perf_counter()
+    events, summary = replay_archives(paths, args.username)
+    metrics = {
+        "files": len(paths),
+        "events": len(events),
+        "parse_seconds": round(time.perf_counter() - started, 3),
+    }
+
+    return events, summary, metrics
+
+
+def fetch_new_events(args: Namespace) -> tuple[list[dict], dict[str, Counter], dict]:
+    """
+    fetches events from the API, adds the unseen ones to the event store and summarizes
+    them
+
+    args:
+        args (Namespace): the parsed CLI arguments
+
+    returns:
+        tuple[list[dict], dict[str, Counter], dict]: the fetched events, their summary
+        and the request metrics
+    """
+    import store
+    from aggregate import summarize
+    from cache import HTTPCache
+    from client import HTTPClient
+    from fetch import fetch_events
+    from scheduler import RateLimiter
+
+    cache = None if args.no_cache else HTTPCache(cache_dir, ttl=args.cache_ttl)
+    client = HTTPClient(timeout=args.timeout)
+    limiter = RateLimiter(opener=client.urlopen)
+    conn = store.open_store(events_db)
+    since = store.latest_event_ids(conn, args.username)
+
+    try:
+        results = fetch_events(
+            args.username, api_url, headers, args.workers, cache, limiter, since
+        )
+    finally:
+        client.close()
+    events = [event for events in results.values() for event in events]
+    new_events = store.insert_events(conn, events)
+
+    metrics = limiter.metrics() | client.metrics() | {"new_events": new_events}
+
+    return events, summarize(events), metrics
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    runs the CLI
+
+    args:
+        argv (list[str] | None): the CLI arguments, defaulting to sys.argv
+
+    returns:
+        None
+    """
+    args = parse_args(argv)
+
+    # each input mode imports only what it needs, so replays never load urllib or sqlite
+    if args.from_file or args.from_dir:
+        events, summary, metrics = replay_events(args)
+    else:
+        events, summary, metrics = fetch_new_events(args)
+
+    from render import render
+
+    started = time.perf_counter()
+    output = render(events, summary, args.format)
+    metrics["render_seconds"] = round(time.perf_counter() - started, 3)
+    sys.stdout.write(output)
+
+    if args.metrics:
+        import json
+
+        print(json.dumps(metrics), file=sys.stderr)
 
-data = utilities.open_url(req)
-utilities.create_and_write_json(json_file, data)
 
 if __name__ == "__main__":
-    for event in data:
-        handlers = EVENT_HANDLERS.get(event["type"])
-        if handlers:
-            output_string = handlers(event)
-            if event["type"] == "PushEvent":
-                continue
-            print(output_string)
-
-    if push_count:
-        for repo, count in push_count.items():
-            print(f"pushed {count} commits to {repo}\n")
+    main()
@@ -8,6 +8,74 @@ import argparse
 
 parser = argparse.ArgumentParser()
 parser.add_argument(
-    "username", metavar="username", help="enter a username to see activity"
+    "username",
+    metavar="username",
+    nargs="*",
+    help="enter one or more usernames to see activity",
 )
-args = parser.parse_args()
+parser.add_argument(
+    "--from-file",
+    nargs="+",
+    default=[],
+    metavar="path",
+    help="replay archived events (.json, .jsonl, optionally .gz) instead of fetching",
+)
+parser.add_argument(
+    "--from-dir",
+    metavar="directory",
+    help="replay every archived event file in a directory instead of fetching",
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=8,
+    help="the number of API requests to send at once",
+)
+parser.add_argument(
+    "--timeout",
+    type=float,
+    default=10,
+    help="seconds to wait for the API to connect or send data",
+)
+parser.add_argument(
+    "--cache-ttl",
+    type=float,
+    default=60,
+    help="seconds to reuse cached events before revalidating them with the API",
+)
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="always download events instead of using the on-disk cache",
+)
+parser.add_argument(
+    "--metrics",
+    action="store_true",
+    help="print request throughput and rate limit budget to stderr",
+)
+parser.add_argument(
+    "-f",
+    "--format",
+    choices=["text", "jsonl"],
+    default="text",
+    help="print readable text, or one JSON object per event",
+)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    parses and validates the command line
+
+    args:
+        argv (list[str] | None): the CLI arguments, defaulting to sys.argv
+
+    returns:
+        argparse.Namespace: the parsed arguments
+    """
+    args = parser.parse_args(argv)
+
+    if not args.username and not (args.from_file or args.from_dir):
+        parser.error("enter a username, or archived events with --from-file/--from-dir")
+
+    return args
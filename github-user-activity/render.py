@@ -0,0 +1,101 @@
+"""
+render.py
+
+contains the output pipeline that renders events as text or JSON lines
+"""
+
+from collections import Counter
+
+from handlers import EVENT_HANDLERS
+
+
+def format_events(events: list[dict]) -> list[str | None]:
+    """
+    formats each event with the handler for its type, keeping the events in order
+
+    args:
+        events (list[dict]): github events, newest first
+
+    returns:
+        list[str | None]: the message of each event, or None for types without a handler
+    """
+    # bound once, so the loop does one dict lookup per event and no attribute lookups
+    get_handler = EVENT_HANDLERS.get
+
+    return [
+        handler(event) if (handler := get_handler(event["type"])) else None
+        for event in events
+    ]
+
+
+def render_text(events: list[dict], summary: dict[str, Counter]) -> str:
+    """
+    renders events and pushed commits as the CLI's plain text output
+
+    args:
+        events (list[dict]): github events, newest first
+        summary (dict[str, Counter]): the summary of the events from aggregate.py
+
+    returns:
+        str: the complete output
+    """
+    lines = [message for message in format_events(events) if message is not None]
+    lines.extend(
+        f"pushed {count} commits to {repo}\n"
+        for repo, count in summary["commits"].items()
+    )
+
+    return "".join(f"{line}\n" for line in lines)
+
+
+def render_jsonl(events: list[dict], summary: dict[str, Counter]) -> str:
+    """
+    renders events and pushed commits as one JSON object per line
+
+    args:
+        events (list[dict]): github events, newest first
+        summary (dict[str, Counter]): the summary of the events from aggregate.py
+
+    returns:
+        str: the complete output
+    """
+    import json
+
+    lines = [
+        json.dumps(
+            {
+                "id": event["id"],
+                "type": event["type"],
+                "actor": event["actor"].get("login"),
+                "repo": event["repo"].get("name"),
+                "created_at": event["created_at"],
+                "message": message.strip(),
+            }
+        )
+        for event, message in zip(events, format_events(events))
+        if message is not None
+    ]
+    lines.extend(
+        json.dumps({"type": "PushSummary", "repo": repo, "commits": count})
+        for repo, count in summary["commits"].items()
+    )
+
+    return "".join(f"{line}\n" for line in lines)
+
+
+RENDERERS = {"text": render_text, "jsonl": render_jsonl}
+
+
+def render(events: list[dict], summary: dict[str, Counter], fmt: str = "text") -> str:
+    """
+    renders the CLI output in the given format
+
+    args:
+        events (list[dict]): github events, newest first
+        summary (dict[str, Counter]): the summary of the events from aggregate.py
+        fmt (str): one of the keys of RENDERERS
+
+    returns:
+        str: the complete output, written by the caller in a single call
+    """
+    return RENDERERS[fmt](events, summary)
@@ -0,0 +1,243 @@
+"""
+scheduler.py
+
+contains the request scheduler that keeps API calls within github's rate limits
+"""
+
+import math
+import random
+import threading
+import time
+from collections.abc import Callable
+from email.message import Message
+from email.utils import parsedate_to_datetime
+from http.client import HTTPResponse
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+# the most times a rate limited request is retried before giving up
+MAX_RETRIES = 5
+# the first backoff delay in seconds when github doesn't say how long to wait
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+# the share of the rate limit that is spent in bursts before requests are spread out
+BURST_SHARE = 0.1
+
+
+def parse_retry_after(value: str) -> float | None:
+    """
+    reads a Retry-After header, which is either a number of seconds or an HTTP-date
+
+    args:
+        value (str): the value of the header
+
+    returns:
+        float | None: the seconds to wait, or None if the value is neither form
+    """
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    if not math.isfinite(seconds):
+        return None
+
+    return max(0.0, seconds)
+
+
+class RateLimiter:
+    """
+    tracks the rate limit budget reported by github and schedules requests within it.
+
+    while plenty of the budget is left, requests go out as fast as the workers send them.
+    once the remaining requests drop below BURST_SHARE of the limit, they are spaced evenly
+    until the window resets, and when the budget is spent every request waits for the reset.
+    rate limited responses (429, or 403 with an empty budget or a Retry-After header) are
+    retried after the delay github asks for, or with jittered exponential backoff.
+    """
+
+    def __init__(self, opener: Callable[[Request], HTTPResponse] = urlopen):
+        """
+        args:
+            opener (Callable[[Request], HTTPResponse]): sends a request, i.e. urllib's
+                urlopen or HTTPClient.urlopen
+        """
+        self.opener = opener
+        self.lock = threading.Lock()
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset: float | None = None
+        self.poll_interval: int | None = None
+        self.next_slot = 0.0
+
+        self.started = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.waited = 0.0
+
+    def update(self, headers: Message | None) -> None:
+        """
+        records the rate limit headers of a response
+
+        args:
+            headers (Message | None): the headers of a response or an HTTPError
+
+        returns:
+            None
+
+        raises:
+            ValueError: if a rate limit header isn't a number
+        """
+        if headers is None:
+            return
+
+        with self.lock:
+            if headers.get("X-RateLimit-Limit"):
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if headers.get("X-RateLimit-Remaining"):
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if headers.get("X-RateLimit-Reset"):
+                self.reset = float(headers["X-RateLimit-Reset"])
+            if headers.get("X-Poll-Interval"):
+                self.poll_interval = int(headers["X-Poll-Interval"])
+
+    def delay(self) -> float:
+        """
+        reserves the next request slot and returns how long to wait for it
+
+        returns:
+            float: the seconds to sleep before sending the request
+        """
+        with self.lock:
+            now = time.monotonic()
+            until_reset = max(0.0, self.reset - time.time()) if self.reset else 0.0
+
+            if self.remaining is None or self.limit is None:
+                spacing = 0.0
+            elif self.remaining <= 0:
+                # wait out the window, then let the first response refresh the budget
+                self.remaining = None
+                self.next_slot = max(self.next_slot, now + until_reset)
+                spacing = 0.0
+            elif self.remaining < self.limit * BURST_SHARE:
+                spacing = until_reset / self.remaining
+                self.remaining -= 1
+            else:
+                spacing = 0.0
+                self.remaining -= 1
+
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + spacing
+            self.requests += 1
+
+            return slot - now
+
+    def retry_delay(self, error: HTTPError, attempt: int) -> float | None:
+        """
+        decides whether a failed request is retried and after how long
+
+        args:
+            error (HTTPError): the error raised for the request
+            attempt (int): the number of retries already made
+
+        returns:
+            float | None: the seconds to wait before retrying, or None to give up
+        """
+        if error.code not in (403, 429) or attempt >= MAX_RETRIES:
+            return None
+
+        retry_after = error.headers.get("Retry-After") if error.headers else None
+        if retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return seconds
+
+        if self.remaining == 0 and self.reset:
+            return max(0.0, self.reset - time.time()) + random.uniform(0, 1)
+
+        # a 403 that isn't about the rate limit, i.e. a blocked or private resource
+        if error.code == 403 and not retry_after:
+            return None
+
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+    def urlopen(self, request: Request) -> HTTPResponse:
+        """
+        sends a request once the schedule allows it, retrying while it's rate limited
+
+        args:
+            request (Request): the request to send
+
+        returns:
+            HTTPResponse: the response, whose rate limit headers have been recorded
+
+        raises:
+            HTTPError: for any response that isn't rate limited or ran out of retries
+            ValueError: if the rate limit headers of a response aren't numbers
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            self.sleep(self.delay())
+
+            try:
+                response = self.opener(request)
+            except HTTPError as e:
+                self.update(e.headers)
+                wait = self.retry_delay(e, attempt)
+                if wait is None:
+                    raise
+
+                with self.lock:
+                    self.retries += 1
+                self.sleep(wait)
+                continue
+
+            try:
+                self.update(response.headers)
+            except ValueError:
+                # the body won't be read, so its connection can't go back to a pool
+                response.close()
+                raise
+
+            return response
+
+    def sleep(self, seconds: float) -> None:
+        """
+        sleeps on behalf of a request and adds the time to the metrics
+
+        args:
+            seconds (float): the seconds to sleep
+
+        returns:
+            None
+        """
+        if seconds <= 0:
+            return
+
+        with self.lock:
+            self.waited += seconds
+        time.sleep(seconds)
+
+    def metrics(self) -> dict:
+        """
+        summarizes the throughput and rate limit budget so far
+
+        returns:
+            dict: request, retry and wait totals, requests per second and the last known budget
+        """
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            throughput = self.requests / elapsed if elapsed else 0
+
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "waited_seconds": round(self.waited, 3),
+                "requests_per_second": round(throughput, 2),
+                "rate_limit": self.limit,
+                "rate_limit_remaining": self.remaining,
+                "rate_limit_reset": self.reset,
+                "poll_interval": self.poll_interval,
+            }
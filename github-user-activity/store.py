@@ -0,0 +1,100 @@
+"""
+store.py
+
+contains the local sqlite event store that keeps every fetched event exactly once
+"""
+
+import json
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    actor TEXT NOT NULL COLLATE NOCASE,
+    repo TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_actor_id ON events (actor, id);
+CREATE INDEX IF NOT EXISTS idx_events_repo ON events (repo, created_at);
+CREATE INDEX IF NOT EXISTS idx_events_type ON events (type, created_at);
+CREATE INDEX IF NOT EXISTS idx_events_created_at ON events (created_at);
+"""
+
+
+def open_store(path: str) -> sqlite3.Connection:
+    """
+    opens the event store, creating its table and indexes if they don't exist
+
+    args:
+        path (str): the path to the sqlite database
+
+    returns:
+        sqlite3.Connection: an open connection to the store
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(SCHEMA)
+
+    return conn
+
+
+def latest_event_ids(conn: sqlite3.Connection, usernames: list[str]) -> dict[str, int]:
+    """
+    finds the newest stored event of each user, so fetching can stop once it is reached
+
+    github event ids increase over time, so the largest id is the newest event.
+
+    args:
+        conn (sqlite3.Connection): an open connection to the store
+        usernames (list[str]): the github usernames being fetched
+
+    returns:
+        dict[str, int]: the newest stored event id of each user that has any
+    """
+    latest = {}
+    for username in usernames:
+        (event_id,) = conn.execute(
+            "SELECT MAX(id) FROM events WHERE actor = ?", (username,)
+        ).fetchone()
+        if event_id is not None:
+            latest[username] = event_id
+
+    return latest
+
+
+def insert_events(conn: sqlite3.Connection, events: list[dict]) -> int:
+    """
+    adds events to the store, skipping any that are already stored
+
+    args:
+        conn (sqlite3.Connection): an open connection to the store
+        events (list[dict]): github API events
+
+    returns:
+        int: the number of events that weren't stored before
+    """
+    before = conn.total_changes
+
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO events (id, type, actor, repo, created_at, event)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    int(event["id"]),
+                    event["type"],
+                    event["actor"]["login"],
+                    event["repo"]["name"],
+                    event["created_at"],
+                    json.dumps(event, separators=(",", ":")),
+                )
+                for event in events
+            ),
+        )
+
+    return conn.total_changes - before
@@ -0,0 +1,230 @@
+"""
+stream.py
+
+contains the streaming parser that reads github events one at a time from a file or response
+"""
+
+import json
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+# characters read from the stream at a time
+CHUNK_SIZE = 64 * 1024
+# the files picked up from an archive directory, compressed or not
+ARCHIVE_PATTERNS = ("*.json", "*.jsonl", "*.json.gz", "*.jsonl.gz")
+
+# the payload fields read by each handler in EVENT_HANDLERS and by aggregate.py, as
+# dotted paths. projected events keep only these, so bulky objects like payload.commits
+# are dropped as soon as each event is parsed
+PAYLOAD_FIELDS = {
+    "CommitCommentEvent": ("comment.html_url",),
+    "CreateEvent": ("ref_type",),
+    "DeleteEvent": ("ref_type", "ref"),
+    "ForkEvent": ("forkee.name", "repository.name", "sender.login"),
+    "GollumEvent": (),
+    "IssuesEvent": ("action", "issue.html_url"),
+    "IssueCommentEvent": ("comment.html_url",),
+    "MemberEvent": ("action", "member.login", "sender.login"),
+    "PublicEvent": (),
+    "PullRequestEvent": ("action", "pull_request.html_url"),
+    "PullRequestReviewEvent": ("action", "pull_request.html_url"),
+    "PullRequestReviewCommentEvent": ("action", "pull_request.html_url"),
+    "PullRequestReviewThreadEvent": ("action",),
+    "PushEvent": ("size",),
+    "ReleaseEvent": ("action", "release.html_url"),
+    "SponsorshipEvent": (
+        "action",
+        "sponsorship.sponsor.login",
+        "sponsorship.sponsorable.login",
+    ),
+    "WatchEvent": (),
+}
+
+PAYLOAD_PATHS = {
+    event_type: [path.split(".") for path in paths]
+    for event_type, paths in PAYLOAD_FIELDS.items()
+}
+
+decoder = json.JSONDecoder()
+# whitespace and the array punctuation between top-level events
+separators = re.compile(r"[\s,\[\]]*")
+
+
+def iter_json_values(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    yields the objects of a JSON array, of JSON lines, or of concatenated JSON objects
+
+    only the current chunk and the object being parsed are held in memory, however large
+    the stream is. the values yielded are the objects inside a top-level array, not the
+    array itself.
+
+    args:
+        stream (TextIO): a text stream, i.e. an open file or a decoded response
+        chunk_size (int): the number of characters read at a time
+
+    returns:
+        Iterator: each parsed object in order
+
+    raises:
+        json.JSONDecodeError: if the stream ends inside an object or isn't JSON
+    """
+    buffer = ""
+    position = 0
+
+    while True:
+        position = separators.match(buffer, position).end()
+
+        if position == len(buffer):
+            buffer = stream.read(chunk_size)
+            position = 0
+            if not buffer:
+                return
+            continue
+
+        try:
+            value, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # the object continues in the next chunk
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield value
+
+
+def project(value: dict, paths: list[list[str]]) -> dict:
+    """
+    copies only the given nested fields of a dictionary
+
+    args:
+        value (dict): the dictionary to copy from
+        paths (list[list[str]]): the keys leading to each field to keep
+
+    returns:
+        dict: a dictionary with the same nesting that contains only the kept fields
+    """
+    projected = {}
+
+    for *parents, leaf in paths:
+        source, target = value, projected
+        for key in parents:
+            source = source.get(key) or {}
+            target = target.setdefault(key, {})
+        if leaf in source:
+            target[leaf] = source[leaf]
+
+    return projected
+
+
+def project_event(event: dict) -> dict:
+    """
+    trims an event down to the fields the handlers read
+
+    args:
+        event (dict): a single github event object
+
+    returns:
+        dict: the event's id, type, actor, repo, creation time and handled payload fields
+    """
+    actor = event.get("actor") or {}
+
+    return {
+        "id": event.get("id"),
+        "type": event.get("type"),
+        "actor": {
+            "login": actor.get("login"),
+            "display_login": actor.get("display_login"),
+        },
+        "repo": {"name": (event.get("repo") or {}).get("name")},
+        "created_at": event.get("created_at"),
+        "payload": project(
+            event.get("payload") or {}, PAYLOAD_PATHS.get(event.get("type"), [])
+        ),
+    }
+
+
+def iter_events(
+    stream: TextIO, projected: bool = True, chunk_size: int = CHUNK_SIZE
+) -> Iterator[dict]:
+    """
+    yields github events one at a time from a stream of saved or downloaded events
+
+    args:
+        stream (TextIO): a text stream of a JSON array of events, or one event per line
+        projected (bool): whether to keep only the fields the handlers read
+        chunk_size (int): the number of characters read at a time
+
+    returns:
+        Iterator[dict]: each event in order
+    """
+    events = iter_json_values(stream, chunk_size)
+
+    if not projected:
+        yield from events
+
+        return
+
+    for event in events:
+        yield project_event(event)
+
+
+def open_archive(path: str) -> TextIO:
+    """
+    opens an archived event dump for reading, decompressing it if it is gzipped
+
+    args:
+        path (str): a .json or .jsonl file, optionally ending in .gz
+
+    returns:
+        TextIO: a text stream of the dump
+    """
+    if path.endswith(".gz"):
+        import gzip
+
+        return gzip.open(path, "rt", encoding="utf-8")
+
+    return open(path, encoding="utf-8")
+
+
+def archive_paths(directory: str) -> list[str]:
+    """
+    lists the event dumps in a directory
+
+    args:
+        directory (str): a directory of archived event dumps
+
+    returns:
+        list[str]: the paths of every file matching ARCHIVE_PATTERNS, sorted by name
+    """
+    return sorted(
+        str(path)
+        for pattern in ARCHIVE_PATTERNS
+        for path in Path(directory).glob(pattern)
+    )
+
+
+def iter_archives(
+    paths: list[str], usernames: list[str] | None = None
+) -> Iterator[dict]:
+    """
+    yields the projected events of archived dumps one at a time, in file order
+
+    args:
+        paths (list[str]): the archived dumps to read
+        usernames (list[str] | None): only yield events by these users, if given
+
+    returns:
+        Iterator[dict]: each projected event
+    """
+    actors = {username.lower() for username in usernames} if usernames else None
+
+    for path in paths:
+        with open_archive(path) as f:
+            for event in iter_events(f):
+                if actors is None or (event["actor"]["login"] or "").lower() in actors:
+                    yield event
@@ -4,50 +4,6 @@ utilities.py
 contains all functions used in CLI logic
 """
 
-import json
-from pathlib import Path
-from typing import TextIO
-from urllib.error import HTTPError
-from urllib.request import Request, urlopen
-
-from variables import push_count
-
-
-def create_and_write_json(file: TextIO, data: list[dict]) -> None:
-    """
-    creates a .json file if it doesn't exist and writes to it.
-
-    args:
-        file (TextIO): a .json file
-        data (list[dict]): a list of github API events
-
-    returns:
-        None
-    """
-    Path(file).touch()
-
-    with open(file, "w") as f:
-        json.dump(data, f, indent=2)
-
-
-def open_url(request: Request) -> list[dict]:
-    """
-    creates a json object from an HTTP request
-
-    args:
-        request (Request): a Request object from urllib requesting data from a given url
-
-    returs:
-        data (list): a list containing the result of the HTTP request
-    """
-    try:
-        with urlopen(request) as response:
-            data = json.loads(response.read().decode())
-    except HTTPError as e:
-        print(f"error: {e.code} - {e.reason}")
-
-    return data
-
 
 def get_comment_events(event: dict) -> str:
     """
@@ -258,26 +214,6 @@ def get_pull_request_review_thread_events(event: dict) -> str:
     return f"{user} marked pull request comment thread as {action} in {repo_name}\n"
 
 
-def get_push_events(event: dict) -> dict:
-    """
-    aggregates push event commits to a given repository
-
-    args:
-        event (dict): a single github event object
-
-    returns:
-        dict: an updated push_count dictionary containing push event aggregation
-    """
-    repo_name = event["repo"].get("name", "")
-    count = event["payload"].get("size", 0)
-
-    if repo_name not in push_count:
-        push_count[repo_name] = 0
-    push_count[repo_name] += count
-
-    return push_count
-
-
 def get_release_events(event: dict) -> str:
     """
     prints to the terminal release information for a given repository
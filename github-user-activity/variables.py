@@ -4,14 +4,17 @@ variables.py
 contains all applicable variables for CLI application
 """
 
-from urllib.request import Request
+import os
 
-from parsers import args
-
-username: str = args.username
-json_file = "github-activity.json"
-headers = {"Accept": "application/vnd.github+json"}
-url = f"https://api.github.com/users/{username}/events"
-req = Request(url=url, headers=headers)
-
-push_count = {}
+events_db = "github-activity.db"
+cache_dir = ".github-cache"
+# github rejects API requests without a User-Agent
+headers = {
+    "Accept": "application/vnd.github+json",
+    "User-Agent": "github-user-activity",
+}
+# authenticated requests get 5000 requests an hour instead of 60
+if os.environ.get("GITHUB_TOKEN"):
+    headers["Authorization"] = f"Bearer {os.environ['GITHUB_TOKEN']}"
+# set GITHUB_API_URL to use a github enterprise server or a local stub server
+api_url = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")